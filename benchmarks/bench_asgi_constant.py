@@ -0,0 +1,58 @@
+# benchmarks/bench_asgi_constant.py
+# Requests/sec for constant routes on the in-process ASGI app, before and
+# after freeze_routes()
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_asgi_constant
+
+import asyncio
+import time
+
+from webapp.routes import get_route
+from webapp.server import app
+
+
+async def legacy_app(scope, receive, send):
+    """
+    webapp.server.app as it was before frozen routes: look the route up,
+    compare against "404 Not Found", rebuild headers and encode every time.
+    """
+    handler = get_route(scope["path"])
+    if callable(handler):
+        await handler(scope, receive, send)
+    else:
+        status_code = 200 if handler != "404 Not Found" else 404
+        headers = [(b"content-type", b"text/plain")]
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": handler.encode()})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def requests_per_second(asgi_app, path, seconds=1.0):
+    scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(1000):
+            await asgi_app(scope, receive, send)
+        count += 1000
+    return count / seconds
+
+
+async def main():
+    print(f"{'path':>12} {'before req/s':>14} {'after req/s':>13} {'speedup':>8}")
+    for path in ("/", "/about", "/missing"):
+        before = await requests_per_second(legacy_app, path)
+        after = await requests_per_second(app, path)
+        print(f"{path:>12} {before:>14,.0f} {after:>13,.0f} {after / before:>7.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+# benchmarks/bench_batching.py
+# predict_async throughput and p99 with and without micro-batching
+# at 1, 64 and 1,024 concurrent clients
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_batching
+
+import argparse
+import asyncio
+import random
+import time
+
+from webapp import torch_model
+
+
+async def client(deadline, latencies):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await torch_model.predict_async(random.random())
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0)  # let other clients in, like a real request would
+
+
+async def run(clients, seconds):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(client(deadline, latencies) for _ in range(clients)))
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / seconds, p99 * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    batcher = torch_model.get_batcher()
+    configs = [
+        ("unbatched", 1, 0.0),
+        ("batched", 64, 0.0),
+        ("batched", 64, 0.002),
+        ("batched", 256, 0.002),
+    ]
+    print(f"{'mode':>10} {'max batch':>10} {'wait ms':>8} {'clients':>8} "
+          f"{'pred/s':>10} {'p99 ms':>8} {'avg batch':>10}")
+    for clients in (1, 64, 1024):
+        for name, max_batch_size, max_wait in configs:
+            batcher.max_batch_size, batcher.max_wait = max_batch_size, max_wait
+            batcher.stats.update(batches=0, items=0)
+            rps, p99 = await run(clients, args.seconds)
+            avg = batcher.stats["items"] / max(batcher.stats["batches"], 1)
+            print(f"{name:>10} {max_batch_size:>10} {max_wait * 1000:>8.1f} {clients:>8} "
+                  f"{rps:>10,.0f} {p99:>8.2f} {avg:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+# benchmarks/bench_body.py
+# Reading 1 KB - 50 MB request bodies sent in small chunks:
+# `body += chunk` (old route code) vs. webapp.body.read_body / iter_body
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_body
+#     python -m benchmarks.bench_body --chunk-size 1024
+
+import argparse
+import asyncio
+import hashlib
+import time
+
+from webapp.body import iter_body, read_body
+
+SIZES = [1024, 64 * 1024, 1024 * 1024, 5 * 1024 * 1024, 50 * 1024 * 1024]
+LEGACY_LIMIT = 5 * 1024 * 1024  # quadratic beyond this takes minutes
+
+
+def make_receive(size, chunk_size):
+    chunk = b"x" * chunk_size
+    full, rest = divmod(size, chunk_size)
+    messages = [{"type": "http.request", "body": chunk, "more_body": True}] * full
+    if rest:
+        messages.append({"type": "http.request", "body": chunk[:rest], "more_body": True})
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+    feed = iter(messages)
+
+    async def receive():
+        return next(feed)
+
+    return receive
+
+
+async def legacy(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            break
+    return body
+
+
+async def buffered(receive):
+    return await read_body(receive, max_size=1 << 30)
+
+
+async def streamed(receive):
+    # Incremental processing: never holds the whole body
+    digest = hashlib.sha256()
+    async for chunk in iter_body(receive, max_size=1 << 30):
+        digest.update(chunk)
+    return digest.digest()
+
+
+async def timed(reader, size, chunk_size):
+    receive = make_receive(size, chunk_size)
+    start = time.perf_counter()
+    await reader(receive)
+    return time.perf_counter() - start
+
+
+def human(size):
+    return f"{size // (1024 * 1024)} MB" if size >= 1024 * 1024 else f"{size // 1024} KB"
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    print(f"chunk size {args.chunk_size} bytes")
+    print(f"{'body':>7} {'body += ms':>11} {'read_body ms':>13} {'iter_body+sha256 ms':>20}")
+    for size in SIZES:
+        old = (
+            f"{await timed(legacy, size, args.chunk_size) * 1000:>11.2f}"
+            if size <= LEGACY_LIMIT
+            else f"{'(skipped)':>11}"
+        )
+        new = await timed(buffered, size, args.chunk_size) * 1000
+        stream = await timed(streamed, size, args.chunk_size) * 1000
+        print(f"{human(size):>7} {old} {new:>13.2f} {stream:>20.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+# benchmarks/bench_gpu_kernels.py
+# Chapter 6 kernels on NumPy, Numba CPU (parallel) and CUDA over a sweep of
+# array sizes: median, p95 and stddev per run, JSON for regression tracking
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_gpu_kernels
+#     python -m benchmarks.bench_gpu_kernels --sizes 1000 1000000 --output gpu.json
+#     NUMBA_ENABLE_CUDASIM=1 python -m benchmarks.bench_gpu_kernels --sizes 1000 10000
+
+import argparse
+
+from webapp.gpu_bench import REPEATS, SIZES, WARMUP_RUNS, run_sweep, to_json
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--kernels", nargs="+", default=["add", "multiply"],
+                        choices=["add", "multiply"])
+    parser.add_argument("--warmup", type=int, default=WARMUP_RUNS)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    report = run_sweep(args.sizes, args.kernels, args.warmup, args.repeats)
+
+    print("compile ms:", report["compile_ms"])
+    print(f"{'kernel':>8} {'backend':>14} {'size':>10} {'median us':>10} "
+          f"{'p95 us':>10} {'stdev us':>9} {'Gelem/s':>8}")
+    for row in report["results"]:
+        print(f"{row['kernel']:>8} {row['backend']:>14} {row['size']:>10,} "
+              f"{row['median_us']:>10.1f} {row['p95_us']:>10.1f} {row['stdev_us']:>9.1f} "
+              f"{row['throughput_gelem_s']:>8.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(to_json(report))
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_http_clients.py
+# Per-call latency of a fresh httpx.AsyncClient per request (the old
+# chapter 20/21 code) vs. the shared pooled client from webapp.http_clients,
+# against a local stand-in upstream
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_http_clients
+#     python -m benchmarks.bench_http_clients --calls 2000 --concurrency 1 16
+
+import argparse
+import asyncio
+import json
+import socket
+import time
+
+import httpx
+
+from webapp.asgi_server import serve
+from webapp.http_clients import close_clients, get_client
+
+USERS = json.dumps([{"id": i, "name": f"user {i}"} for i in range(10)]).encode()
+
+
+async def upstream(scope, receive, send):
+    """
+    Stand-in for jsonplaceholder: every path returns the same small JSON list.
+    """
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(USERS)).encode())]
+    await send({"type": "http.response.start", "status": 200, "headers": headers})
+    await send({"type": "http.response.body", "body": USERS})
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def fresh_client_call(url):
+    async with httpx.AsyncClient() as client:
+        (await client.get(url)).raise_for_status()
+
+
+async def shared_client_call(url):
+    (await get_client(url).get(url)).raise_for_status()
+
+
+async def run(call, url, calls, concurrency):
+    latencies = []
+
+    async def worker(count):
+        for _ in range(count):
+            start = time.perf_counter()
+            await call(url)
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(calls // concurrency) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "calls/s": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    args = parser.parse_args()
+
+    port = free_port()
+    server = await serve(upstream, "127.0.0.1", port)
+    url = f"http://127.0.0.1:{port}/users"
+    modes = {"fresh": fresh_client_call, "shared": shared_client_call}
+    print(f"{'client':>8} {'conc':>5} {'calls/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    async with server:
+        for concurrency in args.concurrency:
+            results = {}
+            for name, call in modes.items():
+                await run(call, url, 50, 1)  # warm imports and the pool
+                results[name] = r = await run(call, url, args.calls, concurrency)
+                print(f"{name:>8} {concurrency:>5} {r['calls/s']:>9,.0f} {r['p50_ms']:>8.3f} "
+                      f"{r['p99_ms']:>8.3f} {r['mean_ms']:>8.3f}")
+            saved = results["fresh"]["mean_ms"] - results["shared"]["mean_ms"]
+            print(f"{'saved':>8} {concurrency:>5} {saved:>36.3f} ms per call")
+        await close_clients()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+# benchmarks/bench_http_server.py
+# req/s and latency of the built-in asyncio server vs. uvicorn on the same routes
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_http_server
+#     python -m benchmarks.bench_http_server --connections 64 --seconds 10
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+SERVERS = {
+    "builtin": (
+        "import asyncio\n"
+        "from webapp.server import start_async_server\n"
+        "asyncio.run(start_async_server('127.0.0.1', {port}))\n"
+    ),
+    "uvicorn": (
+        "import uvicorn\n"
+        "uvicorn.run('webapp.server:app', host='127.0.0.1', port={port},\n"
+        "            log_level='warning', access_log=False, lifespan='on')\n"
+    ),
+}
+
+REQUESTS = {
+    "/": b"GET / HTTP/1.1\r\nHost: bench\r\n\r\n",
+    "/squares": b"GET /squares HTTP/1.1\r\nHost: bench\r\n\r\n",
+    "/predict": (
+        b"POST /predict HTTP/1.1\r\nHost: bench\r\n"
+        b"Content-Type: application/json\r\nContent-Length: 10\r\n\r\n"
+        b'{"x": 2.5}'
+    ),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = None
+    chunked = False
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if (name := name.strip().lower()) == b"content-length":
+            length = int(value)
+        elif name == b"transfer-encoding" and b"chunked" in value.lower():
+            chunked = True
+    if length is not None:
+        await reader.readexactly(length)
+    elif chunked:
+        while (size := int((await reader.readuntil(b"\r\n")).strip(), 16)) > 0:
+            await reader.readexactly(size + 2)
+        await reader.readuntil(b"\r\n")
+    return int(head.split(b" ", 2)[1])
+
+
+async def client(port, request, deadline, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            if await read_response(reader) != 200:
+                raise RuntimeError("unexpected status")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def load(port, request, connections, seconds):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(client(port, request, deadline, latencies) for _ in range(connections)))
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99)]
+    return len(latencies) / seconds, p50 * 1000, p99 * 1000
+
+
+async def wait_until_ready(port, timeout=120.0):
+    """
+    Wait until GET / answers 200: both servers run the startup hooks (DB,
+    model and kernel warmup) first, and answer 503 or refuse connections
+    until those finish.
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(0.1)
+            continue
+        try:
+            writer.write(REQUESTS["/"])
+            if await read_response(reader) == 200:
+                return
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"server on port {port} didn't become ready")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.connections} keep-alive connections, {args.seconds:.0f}s per route")
+    print(f"{'server':>8} {'route':>10} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, code in SERVERS.items():
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-c", code.format(port=port)],
+            cwd=os.getcwd(),
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            await wait_until_ready(port)
+            for route, request in REQUESTS.items():
+                await load(port, request, 4, 0.5)  # warm lazy routes and JIT caches
+                rps, p50, p99 = await load(port, request, args.connections, args.seconds)
+                print(f"{name:>8} {route:>10} {rps:>9,.0f} {p50:>8.2f} {p99:>8.2f}")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+# benchmarks/bench_inference_backends.py
+# Event-loop lag and throughput for each inference backend
+# (inline on the loop, dedicated thread pool, process pool)
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_inference_backends
+#     python -m benchmarks.bench_inference_backends --batch 200000 --workers 2
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from webapp.inference import configure_inference, run_inference, shutdown_inference
+
+TICK = 0.001
+
+
+async def measure_lag(stop):
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+    return lags
+
+
+async def client(batch, deadline, done):
+    while time.perf_counter() < deadline:
+        await run_inference(batch)
+        done.append(len(batch))
+        await asyncio.sleep(0)
+
+
+async def run(backend, clients, batch_size, seconds, workers, torch_threads):
+    configure_inference(backend, workers, torch_threads)
+    batch = [random.random() for _ in range(batch_size)]
+    await run_inference(batch)  # spawn workers, load the model
+
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(stop))
+    done = []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(client(batch, deadline, done) for _ in range(clients)))
+    stop.set()
+    lags = sorted(await ticker)
+    shutdown_inference()
+
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    return sum(done) / seconds, statistics.median(lags) * 1000, p99 * 1000, lags[-1] * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=50_000, help="inputs per forward pass")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--torch-threads", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients, {args.batch:,} inputs per forward pass, "
+          f"{args.workers} worker(s)")
+    print(f"{'backend':>8} {'inputs/s':>12} {'lag p50 ms':>11} {'p99 ms':>8} {'max ms':>8}")
+    for backend in ("inline", "thread", "process"):
+        rate, p50, p99, worst = await run(
+            backend, args.clients, args.batch, args.seconds, args.workers, args.torch_threads
+        )
+        print(f"{backend:>8} {rate:>12,.0f} {p50:>11.2f} {p99:>8.2f} {worst:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+# benchmarks/bench_loop_lag.py
+# Event-loop lag while a slow blocking route is under load, with the route
+# called inline on the loop (old behaviour) vs. dispatched to the thread pool
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_loop_lag
+
+import asyncio
+import statistics
+import time
+
+from webapp.handlers import SYNC
+from webapp.routes import routes
+from webapp.server import app
+
+BLOCK_SECONDS = 0.05
+TICK = 0.001
+
+
+def slow_sync():
+    # Stand-in for /external-users-sync (blocking requests.get)
+    time.sleep(BLOCK_SECONDS)
+    return "done"
+
+
+routes["/slow-sync"] = slow_sync
+routes.set_limit("/slow-sync", 16)
+
+
+async def inline_app(scope, receive, send):
+    """
+    Calls SYNC handlers directly on the loop, like app() did before.
+    """
+    if routes.kind(scope["path"]) == SYNC:
+        body = routes[scope["path"]]().encode()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": body})
+    else:
+        await app(scope, receive, send)
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+async def measure_lag(stop):
+    """
+    Sleep for TICK in a loop and record how late each wake-up is.
+    """
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+    return lags
+
+
+async def run(asgi_app, concurrent):
+    scope = {"type": "http", "method": "GET", "path": "/slow-sync", "headers": []}
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(measure_lag(stop))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(asgi_app(scope, receive, send) for _ in range(concurrent)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    lags = sorted(await ticker)
+    p99 = lags[int(len(lags) * 0.99) - 1] if len(lags) > 1 else lags[0]
+    return elapsed, statistics.median(lags) * 1000, p99 * 1000, lags[-1] * 1000
+
+
+async def main():
+    print(f"slow route blocks {BLOCK_SECONDS * 1000:.0f} ms, pool limit 16")
+    print(f"{'mode':>8} {'clients':>8} {'wall s':>7} {'lag p50 ms':>11} {'p99 ms':>8} {'max ms':>8}")
+    for concurrent in (1, 8, 32):
+        for name, asgi_app in (("inline", inline_app), ("pool", app)):
+            elapsed, p50, p99, worst = await run(asgi_app, concurrent)
+            print(f"{name:>8} {concurrent:>8} {elapsed:>7.2f} {p50:>11.2f} {p99:>8.2f} {worst:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
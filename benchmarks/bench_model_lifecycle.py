@@ -0,0 +1,57 @@
+# benchmarks/bench_model_lifecycle.py
+# Cold start (import, load, first forward pass) and steady-state latency of
+# SimpleNet per compile mode, each in a fresh interpreter
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_model_lifecycle
+#     python -m benchmarks.bench_model_lifecycle --modes eager script compile
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+MEASURE = """
+import json, time
+start = time.perf_counter()
+from webapp import torch_model
+import_ms = (time.perf_counter() - start) * 1000
+stats = torch_model.warmup()
+# Warmup starts at batch size 1, so its first pass is the model's first call
+first_ms = stats["first_call_ms"][1]
+print(json.dumps({"import_ms": import_ms, "first_ms": first_ms, **stats}))
+"""
+
+
+def measure(mode):
+    env = dict(os.environ, WEBAPP_TORCH_COMPILE="" if mode == "eager" else mode)
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", MEASURE],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", nargs="+", default=["eager", "script"],
+                        choices=["eager", "script", "compile"])
+    args = parser.parse_args()
+
+    results = {mode: measure(mode) for mode in args.modes}
+    print("cold start (ms)")
+    print(f"{'mode':>8} {'import':>8} {'load':>8} {'compile':>8} {'1st call':>9} {'warmup':>9}")
+    for mode, r in results.items():
+        print(f"{mode:>8} {r['import_ms']:>8.1f} {r['load_ms']:>8.1f} {r['compile_ms']:>8.1f} "
+              f"{r['first_ms']:>9.2f} {r['warmup_ms']:>9.1f}")
+
+    print("\nsteady-state median ms per forward pass")
+    sizes = next(iter(results.values()))["steady_ms"]
+    print(f"{'mode':>8} " + " ".join(f"{size:>9}" for size in sizes))
+    for mode, r in results.items():
+        print(f"{mode:>8} " + " ".join(f"{ms:>9.3f}" for ms in r["steady_ms"].values()))
+
+
+if __name__ == "__main__":
+    main()
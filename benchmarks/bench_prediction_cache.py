@@ -0,0 +1,77 @@
+# benchmarks/bench_prediction_cache.py
+# predict_async throughput, p99 and hit rate with and without the prediction
+# cache, under Zipf-distributed inputs (a few hot values, a long tail)
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_prediction_cache
+#     python -m benchmarks.bench_prediction_cache --skew 1.1 1.5 2.0 --values 100000
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from webapp import torch_model
+from webapp.prediction_cache import PredictionCache
+
+
+def zipf_inputs(skew, values, count, seed=0):
+    """
+    `count` inputs drawn from `values` distinct floats with Zipf(skew) ranks.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = rng.uniform(-100.0, 100.0, values)
+    ranks = np.minimum(rng.zipf(skew, count), values) - 1
+    return vocabulary[ranks].tolist()
+
+
+async def client(inputs, deadline, latencies):
+    i = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await torch_model.predict_async(inputs[i % len(inputs)])
+        latencies.append(time.perf_counter() - start)
+        i += 1
+        await asyncio.sleep(0)  # let other clients in, like a real request would
+
+
+async def run(inputs, clients, seconds):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    # Each client starts at a different offset of the same input stream
+    stride = len(inputs) // clients
+    await asyncio.gather(
+        *(client(inputs[i * stride :] + inputs[: i * stride], deadline, latencies)
+          for i in range(clients))
+    )
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / seconds, p99 * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--skew", type=float, nargs="+", default=[1.1, 1.5])
+    parser.add_argument("--values", type=int, default=100_000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1_000, 10_000])
+    args = parser.parse_args()
+
+    torch_model.warmup()
+    print(f"{'skew':>6} {'cache':>8} {'pred/s':>10} {'p99 ms':>8} {'hit rate':>9} {'evictions':>10}")
+    for skew in args.skew:
+        inputs = zipf_inputs(skew, args.values, 200_000)
+        for size in args.sizes:
+            cache = PredictionCache(max_size=size) if size else None
+            torch_model.prediction_cache = cache
+            rps, p99 = await run(inputs, args.clients, args.seconds)
+            hit_rate = f"{cache.hit_rate():.1%}" if cache else "-"
+            evictions = cache.stats["evictions"] if cache else "-"
+            print(f"{skew:>6} {size or 'off':>8} {rps:>10,.0f} {p99:>8.2f} "
+                  f"{hit_rate:>9} {evictions:>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+# benchmarks/bench_router.py
+# Linear regex scan (Chapter 15's handle_request) vs. webapp.router.RadixRouter
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_router
+
+import re
+import timeit
+
+from webapp.router import RadixRouter
+
+
+def build_routes(count):
+    """
+    Build a route table of `count` patterns mixing static and typed routes.
+    """
+    routes = {}
+    handler = lambda **params: params
+    for i in range(count):
+        if (kind := i % 4) == 0:
+            routes[rf"^/static-{i}$"] = handler
+        elif kind == 1:
+            routes[rf"^/users-{i}/(?P<user_id>\d+)$"] = handler
+        elif kind == 2:
+            routes[rf"^/posts-{i}/(?P<slug>[\w-]+)/comments/(?P<comment_id>\d+)$"] = handler
+        else:
+            routes[rf"^/files-{i}/(?P<name>[^/]+)$"] = handler
+    return routes
+
+
+def sample_paths(count):
+    """
+    Paths spread across the table, including the last routes and a miss.
+    """
+    paths = []
+    for i in (0, 1, 2, 3, count // 2, count - 4, count - 3, count - 2, count - 1):
+        if (kind := i % 4) == 0:
+            paths.append(f"/static-{i}")
+        elif kind == 1:
+            paths.append(f"/users-{i}/42")
+        elif kind == 2:
+            paths.append(f"/posts-{i}/hello-world/comments/7")
+        else:
+            paths.append(f"/files-{i}/report.final.pdf")
+    paths.append("/does-not-exist")
+    return paths
+
+
+def linear_handle(routes, path):
+    for pattern, handler in routes.items():
+        if (match := re.match(pattern, path)):
+            return handler(**match.groupdict())
+    return "404 Not Found"
+
+
+def bench(count, number=2000):
+    routes = build_routes(count)
+    paths = sample_paths(count)
+    router = RadixRouter.from_routes(routes)
+    # Every pattern above is a typed one; a fallback means compile_pattern regressed
+    assert not router.fallback, [pattern for _, pattern, _ in router.fallback]
+
+    for path in paths:
+        assert linear_handle(routes, path) == router.handle(path), path
+
+    linear = timeit.timeit(
+        lambda: [linear_handle(routes, p) for p in paths], number=number
+    )
+    radix = timeit.timeit(lambda: [router.handle(p) for p in paths], number=number)
+    lookups = number * len(paths)
+    return linear / lookups * 1e6, radix / lookups * 1e6
+
+
+if __name__ == "__main__":
+    print(f"{'routes':>8} {'linear us/req':>14} {'radix us/req':>13} {'speedup':>8}")
+    for count in (10, 100, 1000):
+        number = 2000 if count < 1000 else 200
+        linear_us, radix_us = bench(count, number)
+        print(f"{count:>8} {linear_us:>14.2f} {radix_us:>13.2f} {linear_us / radix_us:>7.1f}x")
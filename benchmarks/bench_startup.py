@@ -0,0 +1,80 @@
+# benchmarks/bench_startup.py
+# Cold-start import time of webapp.server:app, measured with python -X importtime
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_startup            # import only
+#     python -m benchmarks.bench_startup --warmup   # import + warmup_routes()
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+IMPORT_APP = (
+    "import resource\n"
+    "from webapp.server import app\n"
+    "{warmup}"
+    "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+)
+WARMUP = "from webapp.routes import warmup_routes\nwarmup_routes()\n"
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output into {module: cumulative microseconds},
+    keeping only modules imported directly by the top-level code.
+    """
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, module = line.split("|")
+        if not module.startswith("  "):
+            cumulative[module.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def cold_start(warmup=False):
+    """
+    Import the app in a fresh interpreter.
+
+    Returns:
+        tuple: ({module: cumulative us}, max RSS in KB)
+    """
+    code = IMPORT_APP.format(warmup=WARMUP if warmup else "")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rss_kb = int(result.stdout.strip().splitlines()[-1])
+    return parse_importtime(result.stderr), rss_kb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--warmup", action="store_true", help="also resolve lazy routes")
+    args = parser.parse_args()
+
+    runs = [cold_start(args.warmup) for _ in range(args.runs)]
+    app_ms = [modules["webapp.server"] / 1000 for modules, _ in runs]
+    total_ms = [sum(modules.values()) / 1000 for modules, _ in runs]
+    rss_mb = [rss / 1024 for _, rss in runs]
+
+    print(f"webapp.server import: median {statistics.median(app_ms):.1f} ms "
+          f"(min {min(app_ms):.1f}, max {max(app_ms):.1f}) over {args.runs} runs")
+    print(f"all imports{' (incl. warmup)' if args.warmup else ''}: "
+          f"median {statistics.median(total_ms):.1f} ms")
+    print(f"max RSS: median {statistics.median(rss_mb):.1f} MB")
+
+    print("\nSlowest top-level imports (last run):")
+    modules, _ = runs[-1]
+    for name, us in sorted(modules.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {us / 1000:>9.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_upstream_cache.py
+# Latency of fetching the user list straight from the upstream vs. through
+# webapp.upstream_cache, against a local stand-in upstream with a simulated RTT
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_upstream_cache
+#     python -m benchmarks.bench_upstream_cache --rtt-ms 50 --ttl 0.5
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.bench_http_clients import USERS, free_port
+from webapp.asgi_server import serve
+from webapp.http_clients import close_clients, get_client
+from webapp.upstream_cache import UpstreamCache
+
+ETAG = b'"users-v1"'
+
+
+def make_upstream(rtt, requests):
+    async def upstream(scope, receive, send):
+        requests["total"] += 1
+        await asyncio.sleep(rtt)
+        headers = dict(scope["headers"])
+        if headers.get(b"if-none-match") == ETAG:
+            requests["not_modified"] += 1
+            await send({"type": "http.response.start", "status": 304,
+                        "headers": [(b"etag", ETAG), (b"content-length", b"0")]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        response_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(USERS)).encode()),
+            (b"etag", ETAG),
+        ]
+        await send({"type": "http.response.start", "status": 200, "headers": response_headers})
+        await send({"type": "http.response.body", "body": USERS})
+
+    return upstream
+
+
+async def direct(url):
+    response = await get_client(url).get(url)
+    response.raise_for_status()
+    return response.json()
+
+
+async def run(fetch, url, seconds, concurrency):
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await fetch(url)
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    latencies.sort()
+    return (
+        len(latencies) / seconds,
+        latencies[len(latencies) // 2] * 1e6,
+        latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6,
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    parser.add_argument("--ttl", type=float, default=1.0, help="cache TTL in seconds")
+    args = parser.parse_args()
+
+    requests = {"total": 0, "not_modified": 0}
+    port = free_port()
+    server = await serve(make_upstream(args.rtt_ms / 1000, requests), "127.0.0.1", port)
+    url = f"http://127.0.0.1:{port}/users"
+    cache = UpstreamCache(default_ttl=args.ttl, default_stale=60)
+
+    print(f"upstream RTT {args.rtt_ms:.0f} ms, TTL {args.ttl:g} s, {args.concurrency} clients")
+    print(f"{'mode':>8} {'req/s':>10} {'p50 us':>10} {'p99 us':>10} {'upstream':>9} {'304s':>6}")
+    async with server:
+        for name, fetch in (("direct", direct), ("cached", cache.get_json_async)):
+            await fetch(url)  # open the connection / fill the cache
+            requests.update(total=0, not_modified=0)
+            rps, p50, p99 = await run(fetch, url, args.seconds, args.concurrency)
+            print(f"{name:>8} {rps:>10,.0f} {p50:>10.1f} {p99:>10.1f} "
+                  f"{requests['total']:>9} {requests['not_modified']:>6}")
+        print("cache:", cache.snapshot())
+        await close_clients()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+# benchmarks/load_sync_server.py
+# Throughput of the sync server on an I/O-bound route as the worker pool grows
+#
+# Run from the repository root:
+#     python -m benchmarks.load_sync_server
+#     python -m benchmarks.load_sync_server --clients 64 --queue-size 8   # shows 503 shedding
+
+import argparse
+import http.client
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+
+from webapp.routes import routes
+from webapp.server import RequestHandler, make_sync_server
+
+IO_DELAY = 0.02
+
+
+def slow_io():
+    # Stand-in for /file-content or /external-users-sync waiting on I/O
+    time.sleep(IO_DELAY)
+    return "done"
+
+
+routes["/slow-io"] = slow_io
+
+
+class QuietHandler(RequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def fetch(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request("GET", "/slow-io")
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    except (OSError, http.client.HTTPException):
+        return None
+    finally:
+        conn.close()
+
+
+def run(workers, clients, total, queue_size):
+    server = make_sync_server(
+        "127.0.0.1", 0, workers=workers, queue_size=queue_size, handler_class=QuietHandler
+    )
+    port = server.server_address[1]
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        statuses = list(pool.map(lambda _: fetch(port), range(total)))
+    elapsed = time.perf_counter() - start
+
+    server.shutdown()
+    server.server_close()
+    ok = statuses.count(200)
+    return ok / elapsed, ok, statuses.count(503), total - ok - statuses.count(503)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--queue-size", type=int, default=256)
+    args = parser.parse_args()
+
+    print(f"route sleeps {IO_DELAY * 1000:.0f} ms, {args.clients} concurrent clients, "
+          f"{args.requests} requests, queue {args.queue_size}")
+    print(f"{'workers':>8} {'ok req/s':>9} {'200':>5} {'503':>5} {'errors':>7}")
+    for workers in (1, 2, 4, 8, 16, 32):
+        rps, ok, shed, errors = run(workers, args.clients, args.requests, args.queue_size)
+        print(f"{workers:>8} {rps:>9.1f} {ok:>5} {shed:>5} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
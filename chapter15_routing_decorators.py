@@ -53,6 +53,21 @@ print(handle_request("/users/42"))
 print(handle_request("/posts/hello-world"))
 print(handle_request("/unknown"))
 
+# --- Compiled routing with a prefix tree ---
+
+# handle_request() tries every pattern in turn, so it slows down as the
+# route table grows. webapp.router.RadixRouter compiles the same patterns
+# into a tree of path segments (static text, or typed parameters such as
+# \d+ and [\w-]+), so a lookup only walks the segments of the path.
+
+from webapp.router import RadixRouter
+
+router = RadixRouter.from_routes(routes)
+
+print(router.handle("/users/42"))
+print(router.handle("/posts/hello-world"))
+print(router.handle("/unknown"))
+
 # --- Exercises ---
 
 # Exercise 1:
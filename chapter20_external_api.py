@@ -4,8 +4,8 @@
 # This chapter introduces how to fetch data asynchronously from external APIs using `httpx`.
 # It also shows how to integrate async API calls into your ASGI-compatible web framework.
 
-import httpx
-import json
+from webapp.streaming import StreamingResponse, iter_json_array
+from webapp.upstream_cache import cache as upstream_cache
 
 async def fetch_users_async():
     """
@@ -15,10 +15,10 @@ async def fetch_users_async():
         list: List of user dicts.
     """
     url = "https://jsonplaceholder.typicode.com/users"
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        return response.json()
+    # The user list rarely changes: serve it from the upstream cache
+    # (webapp/upstream_cache.py), which refreshes it in the background
+    # through the app's shared client (webapp/http_clients.py)
+    return await upstream_cache.get_json_async(url)
 
 async def external_users_route_async(scope, receive, send):
     """
@@ -27,22 +27,13 @@ async def external_users_route_async(scope, receive, send):
     This demonstrates how to:
     - Receive an ASGI HTTP request
     - Call an async HTTP client (`httpx`) to fetch data
-    - Send a JSON response back to the client
+    - Stream a JSON response back to the client (see webapp/streaming.py)
     """
     users = await fetch_users_async()
-    body = json.dumps(users).encode()
 
-    headers = [(b"content-type", b"application/json")]
-
-    await send({
-        "type": "http.response.start",
-        "status": 200,
-        "headers": headers
-    })
-    await send({
-        "type": "http.response.body",
-        "body": body
-    })
+    # Stream the list item by item instead of building one big JSON string
+    response = StreamingResponse(iter_json_array(users))
+    await response(scope, receive, send)
 
 # --- Exercises ---
 
@@ -74,14 +65,15 @@ def save_exercises_to_webapp():
     # Exercise 1: fetch_users_async with error handling
     exercises_code += (
         "import httpx\n"
+        "from webapp.http_clients import get_client\n"
         "import asyncio\n"
         "async def fetch_users_async_safe():\n"
         "    url = 'https://jsonplaceholder.typicode.com/users'\n"
         "    try:\n"
-        "        async with httpx.AsyncClient() as client:\n"
-        "            response = await client.get(url)\n"
-        "            response.raise_for_status()\n"
-        "            return response.json()\n"
+        "        client = get_client(url)\n"
+        "        response = await client.get(url)\n"
+        "        response.raise_for_status()\n"
+        "        return response.json()\n"
         "    except Exception:\n"
         "        return []\n\n"
     )
@@ -91,10 +83,10 @@ def save_exercises_to_webapp():
         "async def post_user_async(user_data):\n"
         "    url = 'https://jsonplaceholder.typicode.com/users'\n"
         "    try:\n"
-        "        async with httpx.AsyncClient() as client:\n"
-        "            response = await client.post(url, json=user_data)\n"
-        "            response.raise_for_status()\n"
-        "            return response.json()\n"
+        "        client = get_client(url)\n"
+        "        response = await client.post(url, json=user_data)\n"
+        "        response.raise_for_status()\n"
+        "        return response.json()\n"
         "    except Exception as e:\n"
         "        return {'error': str(e)}\n\n"
     )
@@ -129,19 +121,19 @@ def save_exercises_to_webapp():
         "        'https://jsonplaceholder.typicode.com/users',\n"
         "        'https://jsonplaceholder.typicode.com/posts'\n"
         "    ]\n"
-        "    async with httpx.AsyncClient() as client:\n"
-        "        results = await asyncio.gather(*(client.get(url) for url in urls))\n"
-        "        return [resp.status_code for resp in results]\n\n"
+        "    client = get_client(urls[0])  # same upstream for both\n"
+        "    results = await asyncio.gather(*(client.get(url) for url in urls))\n"
+        "    return [resp.status_code for resp in results]\n\n"
     )
 
     # Exercise 5: error handling in async API calls
     exercises_code += (
         "async def safe_get(url):\n"
         "    try:\n"
-        "        async with httpx.AsyncClient() as client:\n"
-        "            resp = await client.get(url)\n"
-        "            resp.raise_for_status()\n"
-        "            return resp.json()\n"
+        "        client = get_client(url)\n"
+        "        resp = await client.get(url)\n"
+        "        resp.raise_for_status()\n"
+        "        return resp.json()\n"
         "    except Exception as e:\n"
         "        return {'error': f'Failed to fetch {url}: {e}'}\n\n"
     )
@@ -151,10 +143,10 @@ def save_exercises_to_webapp():
         "async def retry_get(url, retries=3, delay=0.5):\n"
         "    for attempt in range(retries):\n"
         "        try:\n"
-        "            async with httpx.AsyncClient() as client:\n"
-        "                resp = await client.get(url)\n"
-        "                resp.raise_for_status()\n"
-        "                return resp.json()\n"
+        "            client = get_client(url)\n"
+        "            resp = await client.get(url)\n"
+        "            resp.raise_for_status()\n"
+        "            return resp.json()\n"
         "        except Exception as e:\n"
         "            if attempt == retries - 1:\n"
         "                return {'error': f'Failed after {retries} attempts: {e}'}\n"
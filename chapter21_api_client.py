@@ -5,8 +5,11 @@
 
 import asyncio
 import json
-import requests
-import httpx
+import os
+
+from webapp.http_clients import close_clients, get_client
+from webapp.http_sessions import get_session
+from webapp.upstream_cache import cache as upstream_cache
 
 # --- Synchronous API calls with requests ---
 
@@ -18,9 +21,9 @@ def fetch_users_sync():
         list: List of user dicts.
     """
     url = "https://jsonplaceholder.typicode.com/users"
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.json()
+    # Served from the upstream cache (webapp/upstream_cache.py) while fresh;
+    # fetches go through a pooled session (webapp/http_sessions.py)
+    return upstream_cache.get_json_sync(url)
 
 def create_post_sync(title, body, user_id):
     """
@@ -36,7 +39,7 @@ def create_post_sync(title, body, user_id):
     """
     url = "https://jsonplaceholder.typicode.com/posts"
     payload = {"title": title, "body": body, "userId": user_id}
-    response = requests.post(url, json=payload)
+    response = get_session().post(url, json=payload)
     response.raise_for_status()
     return response.json()
 
@@ -50,11 +53,9 @@ async def fetch_users_async():
         list: List of user dicts.
     """
     url = "https://jsonplaceholder.typicode.com/users"
-    async with httpx.AsyncClient() as client:
-        if (resp := await client.get(url)).status_code == 200:
-            return resp.json()
-        else:
-            resp.raise_for_status()
+    # Cached like fetch_users_sync(); fetches use the shared pooled client
+    # for this upstream (webapp/http_clients.py)
+    return await upstream_cache.get_json_async(url)
 
 async def create_post_async(title, body, user_id):
     """
@@ -70,10 +71,58 @@ async def create_post_async(title, body, user_id):
     """
     url = "https://jsonplaceholder.typicode.com/posts"
     payload = {"title": title, "body": body, "userId": user_id}
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=payload)
-        response.raise_for_status()
-        return response.json()
+    client = get_client(url)
+    response = await client.post(url, json=payload)
+    response.raise_for_status()
+    return response.json()
+
+# Most create-post requests in flight at once in create_posts_bulk(); keep it
+# under the shared client's WEBAPP_HTTP_MAX_CONNECTIONS
+BULK_CONCURRENCY = int(os.environ.get("WEBAPP_BULK_CONCURRENCY", 32))
+
+async def create_posts_bulk(posts, concurrency=BULK_CONCURRENCY):
+    """
+    Create many posts concurrently, at most `concurrency` requests at a time.
+
+    All requests go through the shared pooled client, so thousands of posts
+    reuse a handful of connections instead of opening a socket each.
+
+    Args:
+        posts (list[dict]): Posts with "title", "body" and "userId".
+        concurrency (int): Requests allowed in flight at once.
+
+    Yields:
+        dict: One result per post, in completion order:
+        {"index": i, "status": 201, "post": {...}} on success, or
+        {"index": i, "status": code or None, "error": "..."} on failure.
+    """
+    url = "https://jsonplaceholder.typicode.com/posts"
+    client = get_client(url)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def create(index, post):
+        response = None
+        try:
+            async with semaphore:
+                response = await client.post(url, json=post)
+            if not response.is_success:
+                return {"index": index, "status": response.status_code, "error": response.reason_phrase}
+            return {"index": index, "status": response.status_code, "post": response.json()}
+        except Exception as error:
+            # A network error, a post that can't be encoded or a 2xx with a
+            # non-JSON body fails this post only, not the whole stream
+            status = response.status_code if response is not None else None
+            return {"index": index, "status": status, "error": str(error) or repr(error)}
+
+    tasks = [asyncio.ensure_future(create(index, post)) for index, post in enumerate(posts)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # The consumer closed us early (StreamingResponse does when the
+        # client disconnects): stop the rest
+        for task in tasks:
+            task.cancel()
 
 # --- Example usage ---
 
@@ -92,6 +141,8 @@ async def demo_async():
     print("Creating a post asynchronously...")
     post = await create_post_async("Hello", "This is an async post", 1)
     print("Created post:", post)
+    # The web app does this at shutdown; a script has to do it itself
+    await close_clients()
 
 if __name__ == "__main__":
     demo_sync()
@@ -127,13 +178,14 @@ def save_exercises_to_webapp():
     # Exercise 1: async error handling
     exercises_code += (
         "import httpx\n"
+        "from webapp.http_clients import get_client\n"
         "async def fetch_users_async_safe():\n"
         "    url = 'https://jsonplaceholder.typicode.com/users'\n"
         "    try:\n"
-        "        async with httpx.AsyncClient() as client:\n"
-        "            resp = await client.get(url)\n"
-        "            resp.raise_for_status()\n"
-        "            return resp.json()\n"
+        "        client = get_client(url)\n"
+        "        resp = await client.get(url)\n"
+        "        resp.raise_for_status()\n"
+        "        return resp.json()\n"
         "    except Exception:\n"
         "        return None\n\n"
     )
@@ -143,10 +195,10 @@ def save_exercises_to_webapp():
         "async def fetch_posts_by_user(user_id):\n"
         "    url = 'https://jsonplaceholder.typicode.com/posts'\n"
         "    params = {'userId': user_id}\n"
-        "    async with httpx.AsyncClient() as client:\n"
-        "        resp = await client.get(url, params=params)\n"
-        "        resp.raise_for_status()\n"
-        "        return resp.json()\n\n"
+        "    client = get_client(url)\n"
+        "    resp = await client.get(url, params=params)\n"
+        "    resp.raise_for_status()\n"
+        "    return resp.json()\n\n"
     )
 
     # Exercise 3: integrate into webapp route
@@ -173,33 +225,31 @@ def save_exercises_to_webapp():
         "        'https://jsonplaceholder.typicode.com/users',\n"
         "        'https://jsonplaceholder.typicode.com/users?userId=2'\n"
         "    ]\n"
-        "    async with httpx.AsyncClient() as client:\n"
-        "        results = await asyncio.gather(*(client.get(url) for url in urls))\n"
-        "        return [resp.json() for resp in results]\n\n"
+        "    client = get_client(urls[0])  # same upstream for both\n"
+        "    results = await asyncio.gather(*(client.get(url) for url in urls))\n"
+        "    return [resp.json() for resp in results]\n\n"
     )
 
     # Exercise 5: timeout handling
     exercises_code += (
         "async def fetch_with_timeout(url, timeout=2.0):\n"
         "    try:\n"
-        "        async with httpx.AsyncClient(timeout=timeout) as client:\n"
-        "            resp = await client.get(url)\n"
-        "            resp.raise_for_status()\n"
-        "            return resp.json()\n"
+        "        client = get_client(url)\n"
+        "        resp = await client.get(url, timeout=timeout)\n"
+        "        resp.raise_for_status()\n"
+        "        return resp.json()\n"
         "    except httpx.TimeoutException:\n"
         "        return {'error': 'Request timed out'}\n"
         "    except Exception as e:\n"
         "        return {'error': str(e)}\n\n"
     )
 
-    # Exercise 6: post multiple new posts concurrently
+    # Exercise 6: post multiple new posts concurrently (bounded, see create_posts_bulk)
     exercises_code += (
+        "from chapter21_api_client import create_posts_bulk\n"
         "async def post_multiple_posts(posts):\n"
-        "    url = 'https://jsonplaceholder.typicode.com/posts'\n"
-        "    async with httpx.AsyncClient() as client:\n"
-        "        tasks = [client.post(url, json=post) for post in posts]\n"
-        "        results = await asyncio.gather(*tasks)\n"
-        "        return [resp.json() for resp in results]\n\n"
+        "    results = [result async for result in create_posts_bulk(posts)]\n"
+        "    return [result.get('post') for result in sorted(results, key=lambda r: r['index'])]\n\n"
     )
 
     # Append or update the exercises in webapp/routes.py
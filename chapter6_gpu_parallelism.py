@@ -6,6 +6,8 @@
 from numba import cuda
 import numpy as np
 
+from webapp.gpu_kernels import add_arrays, check_backends, get_backend
+
 # --- Basic GPU Kernel ---
 
 # This is a CUDA kernel function that runs on the GPU.
@@ -26,12 +28,23 @@ result = np.zeros(N, dtype=np.float32)
 threads_per_block = 8
 blocks_per_grid = (N + threads_per_block - 1) // threads_per_block  # simple integer division
 
-# Launch the kernel on the GPU
-add_arrays_kernel[blocks_per_grid, threads_per_block](a, b, result)
+# Launch the kernel on the GPU, if there is one
+if cuda.is_available():
+    add_arrays_kernel[blocks_per_grid, threads_per_block](a, b, result)
+else:
+    # No GPU: webapp/gpu_kernels.py has the same kernel as a parallel CPU
+    # loop (numba.njit(parallel=True) with prange) and picks one for us
+    add_arrays(a, b, result)
 
 print("Array A:", a)
 print("Array B:", b)
-print("Sum (GPU):", result)
+print(f"Sum ({get_backend()}):", result)
+
+# With NUMBA_ENABLE_CUDASIM=1 the CUDA kernels run on Numba's simulator,
+# so both paths can be compared even without a GPU:
+#     NUMBA_ENABLE_CUDASIM=1 python chapter6_gpu_parallelism.py
+if cuda.is_available():
+    print("CUDA and CPU kernels agree:", check_backends())
 
 # --- Mini Web Framework: GPU-accelerated route ---
 
@@ -46,18 +59,14 @@ def gpu_sum_route():
     """
     Simulate a GPU-accelerated computation as a web response.
 
-    This function prepares two arrays, runs the GPU kernel to add them,
-    and returns the result as a string.
+    This function prepares two arrays, adds them with the GPU kernel (or
+    its CPU twin when there is no GPU), and returns the result as a string.
     """
     N = 16
     a = np.arange(N, dtype=np.float32)
     b = np.arange(N, dtype=np.float32)
-    result = np.zeros(N, dtype=np.float32)
 
-    threads_per_block = 8
-    blocks_per_grid = (N + threads_per_block - 1) // threads_per_block  # simple integer division
-
-    add_arrays_kernel[blocks_per_grid, threads_per_block](a, b, result)
+    result = add_arrays(a, b)
 
     return f"GPU sum result: {result.tolist()}"
 
@@ -100,50 +109,12 @@ print(handle_request("/missing"))
 def save_exercises_to_webapp():
     exercises_code = "\n# --- Chapter 6 User Exercises ---\n"
 
-    # Exercise 1: GPU multiply kernel
-    exercises_code += (
-        "from numba import cuda\n"
-        "import numpy as np\n"
-        "\n"
-        "@cuda.jit\n"
-        "def multiply_arrays_kernel(a, b, result):\n"
-        "    idx = cuda.grid(1)\n"
-        "    if idx < a.size:\n"
-        "        result[idx] = a[idx] * b[idx]\n\n"
-    )
-
-    # Exercise 2: /gpu-multiply route
-    exercises_code += (
-        "def gpu_multiply_route():\n"
-        "    N = 16\n"
-        "    a = np.arange(N, dtype=np.float32)\n"
-        "    b = np.arange(N, dtype=np.float32)\n"
-        "    result = np.zeros(N, dtype=np.float32)\n"
-        "    threads_per_block = 8\n"
-        "    blocks_per_grid = (N + threads_per_block - 1) // threads_per_block\n"
-        "    multiply_arrays_kernel[blocks_per_grid, threads_per_block](a, b, result)\n"
-        "    return 'GPU multiply result: ' + str(result.tolist())\n\n"
-        "routes['/gpu-multiply'] = gpu_multiply_route\n\n"
-    )
-
-    # Exercise 3: /gpu-vs-cpu-benchmark route
+    # Exercises 1-3: the multiply kernel (CUDA with a CPU fallback) lives in
+    # webapp/gpu_kernels.py and the routes in webapp/gpu_routes.py; register them
     exercises_code += (
-        "import time\n"
-        "def gpu_vs_cpu_benchmark_route():\n"
-        "    N = 1000000\n"
-        "    a = np.arange(N, dtype=np.float32)\n"
-        "    b = np.arange(N, dtype=np.float32)\n"
-        "    result_gpu = np.zeros(N, dtype=np.float32)\n"
-        "    threads_per_block = 256\n"
-        "    blocks_per_grid = (N + threads_per_block - 1) // threads_per_block\n"
-        "    start_gpu = time.time()\n"
-        "    add_arrays_kernel[blocks_per_grid, threads_per_block](a, b, result_gpu)\n"
-        "    gpu_time = time.time() - start_gpu\n"
-        "    start_cpu = time.time()\n"
-        "    result_cpu = a + b\n"
-        "    cpu_time = time.time() - start_cpu\n"
-        "    return f'GPU time: {gpu_time:.6f}s, CPU time: {cpu_time:.6f}s'\n\n"
-        "routes['/gpu-vs-cpu-benchmark'] = gpu_vs_cpu_benchmark_route\n\n"
+        'routes["/gpu-sum"] = LazyRoute("webapp.gpu_routes:gpu_sum_route")\n'
+        'routes["/gpu-multiply"] = LazyRoute("webapp.gpu_routes:gpu_multiply_route")\n'
+        'routes["/gpu-vs-cpu-benchmark"] = LazyRoute("webapp.gpu_routes:gpu_vs_cpu_benchmark_route")\n\n'
     )
 
     # Append or update the exercises in webapp/routes.py
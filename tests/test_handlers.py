@@ -0,0 +1,79 @@
+# tests/test_handlers.py
+# Blocking routes must run in the thread pool, not on the event loop
+
+import asyncio
+import time
+
+import pytest
+
+from webapp.handlers import SYNC
+from webapp.routes import routes
+from webapp.server import app
+
+BLOCK_SECONDS = 0.2
+CONCURRENT = 16
+TICK = 0.001
+SLOW_PATH = "/test-slow-sync"
+
+
+def slow_sync():
+    # Stand-in for a blocking route such as /external-users-sync
+    time.sleep(BLOCK_SECONDS)
+    return "done"
+
+
+@pytest.fixture
+def slow_route():
+    routes[SLOW_PATH] = slow_sync
+    yield SLOW_PATH
+    routes.pop(SLOW_PATH, None)
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _measure_lag(stop, lags):
+    # Sleep for TICK in a loop and record how late each wake-up is
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def _call_concurrently(path, count):
+    responses = [[] for _ in range(count)]
+    lags = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_measure_lag(stop, lags))
+    await asyncio.sleep(0.02)
+
+    async def call(messages):
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+        await app(scope, _receive, send)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(messages) for messages in responses))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return responses, lags, elapsed
+
+
+def test_slow_sync_route_is_classified_sync(slow_route):
+    assert routes.kind(slow_route) == SYNC
+
+
+def test_loop_lag_stays_flat_under_slow_sync_route(slow_route):
+    responses, lags, elapsed = asyncio.run(_call_concurrently(slow_route, CONCURRENT))
+
+    for messages in responses:
+        assert messages[0]["status"] == 200
+        assert messages[1]["body"] == b"done"
+    # Called inline, each call would stall the loop for BLOCK_SECONDS and
+    # the batch would take CONCURRENT * BLOCK_SECONDS
+    assert max(lags) < BLOCK_SECONDS / 4
+    assert elapsed < BLOCK_SECONDS * CONCURRENT / 4
@@ -0,0 +1,142 @@
+# webapp/api_routes.py
+# Chapter 21: API client routes (registered lazily in webapp/routes.py)
+
+import json
+
+from chapter21_api_client import (
+    fetch_users_sync,
+    create_post_sync,
+    fetch_users_async,
+    create_post_async,
+    create_posts_bulk,
+)
+from webapp.body import ClientDisconnected, RequestBodyTooLarge, read_body, send_payload_too_large
+from webapp.streaming import StreamingResponse, iter_json_array
+from webapp.upstream_cache import cache as upstream_cache
+
+
+def external_users_sync():
+    """
+    Synchronous route that fetches users from an external API.
+    """
+    users = fetch_users_sync()
+    return json.dumps(users)
+
+
+async def external_users_async_route(scope, receive, send):
+    """
+    ASGI async route that fetches users from an external API asynchronously.
+    """
+    users = await fetch_users_async()
+    await StreamingResponse(iter_json_array(users))(scope, receive, send)
+
+
+async def create_post_async_route(scope, receive, send):
+    """
+    ASGI async route that accepts POST JSON input and creates a post via external API.
+    """
+    assert scope["type"] == "http"
+
+    # Read request body
+    try:
+        body_bytes = await read_body(receive, scope=scope)
+    except RequestBodyTooLarge as error:
+        await send_payload_too_large(send, error)
+        return
+    except ClientDisconnected:
+        # Partial body: don't act on it
+        return
+
+    try:
+        data = json.loads(body_bytes.decode())
+        title = data.get("title", "Untitled")
+        body = data.get("body", "")
+        user_id = int(data.get("userId", 1))
+    except Exception:
+        title = "Untitled"
+        body = ""
+        user_id = 1
+
+    post = await create_post_async(title, body, user_id)
+    response_body = json.dumps(post).encode()
+
+    headers = [(b"content-type", b"application/json")]
+
+    await send({"type": "http.response.start", "status": 201, "headers": headers})
+    await send({"type": "http.response.body", "body": response_body})
+
+
+def _parse_posts(body, content_type):
+    """
+    Posts from a JSON array or NDJSON (one JSON object per line) body.
+
+    Raises:
+        ValueError: Malformed body, or an item that isn't a JSON object.
+    """
+    text = body.decode()
+    if content_type == b"application/x-ndjson" or not text.lstrip().startswith("["):
+        posts = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        posts = json.loads(text)
+    if not all(isinstance(post, dict) for post in posts):
+        raise ValueError("Every post must be a JSON object")
+    return posts
+
+
+async def _ndjson(results):
+    try:
+        async for result in results:
+            yield json.dumps(result).encode() + b"\n"
+    finally:
+        # Closed early (client disconnected): cancel the posts still pending
+        await results.aclose()
+
+
+async def create_posts_bulk_route(scope, receive, send):
+    """
+    ASGI route that creates many posts via the external API.
+
+    Accepts a POST body that is either a JSON array of posts or NDJSON
+    (`content-type: application/x-ndjson`, one post per line). Posts are
+    sent with bounded concurrency (WEBAPP_BULK_CONCURRENCY) over the shared
+    pooled client, and one NDJSON line per post is streamed back as each
+    finishes: {"index": i, "status": 201, "post": {...}} or
+    {"index": i, "status": ..., "error": "..."}.
+    """
+    assert scope["type"] == "http"
+
+    content_type = b""
+    for name, value in scope.get("headers", ()):
+        if name == b"content-type":
+            content_type = value.split(b";")[0].strip().lower()
+
+    try:
+        body = await read_body(receive, scope=scope)
+    except RequestBodyTooLarge as error:
+        await send_payload_too_large(send, error)
+        return
+    except ClientDisconnected:
+        # Partial body: don't act on it
+        return
+
+    try:
+        posts = _parse_posts(body, content_type)
+    except (ValueError, TypeError) as error:
+        message = f"Expected a JSON array or NDJSON of post objects: {error}".encode()
+        headers = [(b"content-type", b"text/plain"), (b"content-length", str(len(message)).encode())]
+        await send({"type": "http.response.start", "status": 400, "headers": headers})
+        await send({"type": "http.response.body", "body": message})
+        return
+
+    # flush_size=0: send each result line as soon as it is ready
+    response = StreamingResponse(
+        _ndjson(create_posts_bulk(posts)), content_type=b"application/x-ndjson", flush_size=0
+    )
+    await response(scope, receive, send)
+
+
+def upstream_stats():
+    """
+    Upstream cache and request-coalescing counters as JSON.
+    """
+    return json.dumps(upstream_cache.snapshot())
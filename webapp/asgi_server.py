@@ -0,0 +1,414 @@
+# webapp/asgi_server.py
+# Built-in asyncio HTTP/1.1 server for ASGI apps (keep-alive + pipelining)
+
+import asyncio
+import time
+import traceback
+from collections import deque
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import unquote
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_PIPELINE = 32  # parsed-but-unserved requests before we stop reading
+BODY_HIGH_WATER = 1024 * 1024  # buffered request body bytes before we stop reading
+KEEP_ALIVE_TIMEOUT = 5.0
+
+STATUS_LINES = {
+    status.value: b"HTTP/1.1 %d %s\r\n" % (status.value, status.phrase.encode())
+    for status in HTTPStatus
+}
+
+_date = [0, b""]
+
+
+def _date_header():
+    # The Date header only changes once a second, so build it once a second
+    if (now := int(time.time())) != _date[0]:
+        _date[0] = now
+        _date[1] = b"date: " + formatdate(now, usegmt=True).encode() + b"\r\n"
+    return _date[1]
+
+
+def _simple_response(status, close=True):
+    body = HTTPStatus(status).phrase.encode()
+    return (
+        STATUS_LINES[status]
+        + b"content-type: text/plain\r\ncontent-length: %d\r\n" % len(body)
+        + (b"connection: close\r\n" if close else b"")
+        + _date_header()
+        + b"\r\n"
+        + body
+    )
+
+
+class _Request:
+    """
+    One parsed request and the body chunks that have arrived for it so far.
+    """
+
+    __slots__ = ("scope", "keep_alive", "chunks", "complete", "final_sent", "discard", "data_ready")
+
+    def __init__(self, scope, keep_alive, complete):
+        self.scope = scope
+        self.keep_alive = keep_alive
+        self.chunks = deque()
+        self.complete = complete
+        self.final_sent = False
+        self.discard = False
+        self.data_ready = asyncio.Event()
+
+
+class HTTPProtocol(asyncio.Protocol):
+    """
+    HTTP/1.1 connection handler that dispatches requests to an ASGI app.
+
+    Incoming bytes go into one bytearray that is parsed in place, so
+    pipelined requests are split without extra copies. Requests on a
+    connection are served in order by a single task; responses without a
+    content-length are sent with chunked transfer encoding.
+    """
+
+    def __init__(self, app, loop=None):
+        self.app = app
+        self.loop = loop or asyncio.get_running_loop()
+        self.transport = None
+        self.server_addr = None
+        self.client_addr = None
+        self.buffer = bytearray()
+        self.pending = deque()
+        self.current = None  # request whose body is still arriving
+        self.body_remaining = 0
+        self.buffered_body = 0
+        self.request_ready = asyncio.Event()
+        self.write_ready = asyncio.Event()
+        self.write_ready.set()
+        self.reading_paused = False
+        self.closed = False
+        self.idle_timer = None
+        self.worker = None
+
+    # --- asyncio.Protocol callbacks ---
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.server_addr = (transport.get_extra_info("sockname") or (None, None))[:2]
+        self.client_addr = (transport.get_extra_info("peername") or (None, None))[:2]
+        self.worker = self.loop.create_task(self._serve())
+        self._reset_idle_timer()
+
+    def connection_lost(self, exc):
+        self.closed = True
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+        for request in self.pending:
+            request.complete = True
+            request.data_ready.set()
+        self.request_ready.set()
+        self.write_ready.set()
+
+    def data_received(self, data):
+        self.buffer += data
+        self._parse()
+
+    def pause_writing(self):
+        self.write_ready.clear()
+
+    def resume_writing(self):
+        self.write_ready.set()
+
+    # --- Parsing ---
+
+    def _parse(self):
+        buffer = self.buffer
+        while buffer and not self.closed:
+            if self.current is not None:
+                take = min(self.body_remaining, len(buffer))
+                chunk = bytes(buffer[:take])
+                del buffer[:take]
+                self.body_remaining -= take
+                self._feed(self.current, chunk, self.body_remaining == 0)
+                if self.body_remaining == 0:
+                    self.current = None
+                continue
+
+            if (end := buffer.find(b"\r\n\r\n")) == -1:
+                if len(buffer) > MAX_HEADER_BYTES:
+                    self._fail(431)
+                return
+            if end > MAX_HEADER_BYTES:
+                self._fail(431)
+                return
+
+            head = bytes(buffer[:end])
+            del buffer[: end + 4]
+            try:
+                request, content_length = self._parse_head(head)
+            except ValueError:
+                self._fail(400)
+                return
+            if request is None:
+                self._fail(501)  # chunked request bodies aren't supported
+                return
+
+            self.pending.append(request)
+            self.request_ready.set()
+            if content_length:
+                self.current = request
+                self.body_remaining = content_length
+
+        self._update_reading()
+
+    def _parse_head(self, head):
+        request_line, *header_lines = head.split(b"\r\n")
+        method, target, version = request_line.split(b" ")
+        if not version.startswith(b"HTTP/1."):
+            raise ValueError("unsupported HTTP version")
+        http_version = version[5:].decode()
+
+        headers = []
+        content_length = 0
+        keep_alive = http_version == "1.1"
+        for line in header_lines:
+            name, sep, value = line.partition(b":")
+            if not sep:
+                raise ValueError("malformed header")
+            name = name.strip().lower()
+            value = value.strip()
+            headers.append((name, value))
+            if name == b"content-length":
+                content_length = int(value)
+                if content_length < 0:
+                    raise ValueError("negative content-length")
+            elif name == b"connection":
+                if (token := value.lower()) == b"close":
+                    keep_alive = False
+                elif token == b"keep-alive":
+                    keep_alive = True
+            elif name == b"transfer-encoding" and b"chunked" in value.lower():
+                return None, 0
+
+        path, _, query = target.partition(b"?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+            "http_version": http_version,
+            "method": method.decode("ascii"),
+            "scheme": "http",
+            "path": unquote(path.decode("latin-1")),
+            "raw_path": path,
+            "query_string": query,
+            "root_path": "",
+            "headers": headers,
+            "client": self.client_addr,
+            "server": self.server_addr,
+        }
+        return _Request(scope, keep_alive, complete=content_length == 0), content_length
+
+    def _feed(self, request, chunk, complete):
+        request.complete = complete
+        if not request.discard:
+            request.chunks.append(chunk)
+            self.buffered_body += len(chunk)
+        request.data_ready.set()
+
+    def _fail(self, status):
+        self.transport.write(_simple_response(status))
+        self.transport.close()
+        self.closed = True
+
+    def _update_reading(self):
+        if self.closed:
+            return
+        overloaded = len(self.pending) > MAX_PIPELINE or self.buffered_body > BODY_HIGH_WATER
+        if overloaded and not self.reading_paused:
+            self.reading_paused = True
+            self.transport.pause_reading()
+        elif not overloaded and self.reading_paused:
+            self.reading_paused = False
+            self.transport.resume_reading()
+
+    # --- Keep-alive ---
+
+    def _reset_idle_timer(self):
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+        self.idle_timer = self.loop.call_later(KEEP_ALIVE_TIMEOUT, self._idle_close)
+
+    def _idle_close(self):
+        if not self.pending and not self.closed:
+            self.transport.close()
+
+    # --- Serving ---
+
+    async def _serve(self):
+        while not self.closed:
+            if not self.pending:
+                self.request_ready.clear()
+                await self.request_ready.wait()
+                continue
+
+            request = self.pending[0]
+            if self.idle_timer is not None:
+                self.idle_timer.cancel()
+            keep_alive = await self._handle(request)
+
+            self.pending.popleft()
+            request.discard = True
+            self.buffered_body -= sum(len(chunk) for chunk in request.chunks)
+            request.chunks.clear()
+            if not keep_alive:
+                if not self.closed:
+                    self.transport.close()
+                    self.closed = True
+                return
+            self._update_reading()
+            if not self.pending:
+                self._reset_idle_timer()
+
+    async def _handle(self, request):
+        """
+        Run the app for one request. Returns True if the connection can be reused.
+        """
+        scope = request.scope
+        state = {"head": None, "chunked": False, "done": False, "keep_alive": request.keep_alive}
+
+        async def receive():
+            while not request.chunks and not request.complete:
+                request.data_ready.clear()
+                await request.data_ready.wait()
+            if request.chunks:
+                chunk = request.chunks.popleft()
+                self.buffered_body -= len(chunk)
+                self._update_reading()
+                more_body = bool(request.chunks) or not request.complete
+                request.final_sent = not more_body
+                return {"type": "http.request", "body": chunk, "more_body": more_body}
+            if not request.final_sent and not self.closed:
+                request.final_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # Body fully read: wait until the connection goes away
+            while not self.closed:
+                request.data_ready.clear()
+                await request.data_ready.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if self.closed:
+                return
+            if message["type"] == "http.response.start":
+                state["head"] = self._build_head(scope, message, state)
+            elif message["type"] == "http.response.body":
+                if state["done"]:
+                    return
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                parts = []
+                if (head := state["head"]) is not None:
+                    parts.append(head)
+                    state["head"] = None
+                if state["chunked"]:
+                    if body:
+                        parts += [b"%x\r\n" % len(body), body, b"\r\n"]
+                    if not more_body:
+                        parts.append(b"0\r\n\r\n")
+                elif body:
+                    parts.append(body)
+                if parts:
+                    self.transport.write(parts[0] if len(parts) == 1 else b"".join(parts))
+                if not more_body:
+                    state["done"] = True
+                elif not self.write_ready.is_set():
+                    await self.write_ready.wait()
+
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            traceback.print_exc()
+            if state["head"] is None and not state["done"] and not self.closed:
+                self.transport.write(_simple_response(500))
+            return False
+
+        if not state["done"]:
+            # App returned without finishing the response
+            if state["head"] is None and not self.closed:
+                self.transport.write(_simple_response(500))
+            return False
+        return state["keep_alive"] and not self.closed
+
+    def _build_head(self, scope, message, state):
+        parts = [STATUS_LINES.get(message["status"]) or b"HTTP/1.1 %d \r\n" % message["status"]]
+        has_length = False
+        for name, value in message.get("headers", ()):
+            if (lname := name.lower()) == b"content-length":
+                has_length = True
+            elif lname == b"connection" and value.lower() == b"close":
+                state["keep_alive"] = False
+            parts += [name, b": ", value, b"\r\n"]
+
+        if not has_length:
+            if scope["http_version"] == "1.1":
+                state["chunked"] = True
+                parts.append(b"transfer-encoding: chunked\r\n")
+            else:
+                state["keep_alive"] = False
+        if not state["keep_alive"]:
+            parts.append(b"connection: close\r\n")
+        elif scope["http_version"] == "1.0":
+            parts.append(b"connection: keep-alive\r\n")
+        parts += [_date_header(), b"\r\n"]
+        return b"".join(parts)
+
+
+async def serve(app, host="0.0.0.0", port=8000, backlog=1024):
+    """
+    Start serving an ASGI app on the running loop.
+
+    Returns:
+        asyncio.Server: Call serve_forever() on it, or close() to stop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.create_server(
+        lambda: HTTPProtocol(app, loop), host, port, backlog=backlog, reuse_address=True
+    )
+
+
+class Lifespan:
+    """
+    Server side of the ASGI lifespan protocol.
+
+    Apps that don't support lifespan (they raise on the "lifespan" scope)
+    are served anyway, like uvicorn's --lifespan auto.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.incoming = asyncio.Queue()
+        self.outgoing = asyncio.Queue()
+        self.task = None
+
+    async def _run(self):
+        scope = {"type": "lifespan", "asgi": {"version": "3.0", "spec_version": "2.0"}}
+        try:
+            await self.app(scope, self.incoming.get, self.outgoing.put)
+        except Exception:
+            pass
+        finally:
+            await self.outgoing.put(None)
+
+    async def startup(self):
+        self.task = asyncio.create_task(self._run())
+        await self.incoming.put({"type": "lifespan.startup"})
+        if (message := await self.outgoing.get()) is None:
+            self.task = None  # lifespan not supported
+        elif message["type"] == "lifespan.startup.failed":
+            raise RuntimeError(f"Application startup failed: {message.get('message', '')}")
+
+    async def shutdown(self):
+        if self.task is None or self.task.done():
+            return
+        await self.incoming.put({"type": "lifespan.shutdown"})
+        if (message := await self.outgoing.get()) is not None:
+            if message["type"] == "lifespan.shutdown.failed":
+                print(f"Application shutdown failed: {message.get('message', '')}")
+        await self.task
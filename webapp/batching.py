@@ -0,0 +1,94 @@
+# webapp/batching.py
+# Dynamic micro-batching: many concurrent single-item calls -> one batched call
+
+import asyncio
+import inspect
+
+
+class InferenceBatcher:
+    """
+    Collect concurrent submit() calls into batches for one batched function.
+
+    A batch is flushed when `max_batch_size` items are waiting or when the
+    oldest item has waited `max_wait` seconds, whichever comes first. Each
+    caller gets its own item of the batch result back.
+
+    Args:
+        batch_fn: Called with a list of inputs; returns a list of outputs in
+            the same order. May be a plain function or a coroutine function.
+        max_batch_size (int): Largest batch passed to batch_fn.
+        max_wait (float): Longest time (seconds) an item waits for company;
+            0 batches only the calls made in the same loop iteration.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=64, max_wait=0.002):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.pending = []
+        self.loop = None
+        self.timer = None
+        self.stats = {"batches": 0, "items": 0, "largest": 0}
+
+    async def submit(self, item):
+        """
+        Queue one input and wait for its output.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            # New event loop (e.g. a second asyncio.run): start fresh
+            self.loop, self.pending, self.timer = loop, [], None
+
+        future = loop.create_future()
+        self.pending.append((item, future))
+        if len(self.pending) >= self.max_batch_size:
+            self._flush()
+        elif self.timer is None:
+            if self.max_wait > 0:
+                self.timer = loop.call_later(self.max_wait, self._flush)
+            else:
+                # No window: batch whatever arrives in this loop iteration
+                self.timer = loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        while self.pending:
+            batch = self.pending[: self.max_batch_size]
+            del self.pending[: self.max_batch_size]
+            self.loop.create_task(self._run(batch))
+
+    async def _run(self, batch):
+        inputs = [item for item, _ in batch]
+        self.stats["batches"] += 1
+        self.stats["items"] += len(batch)
+        self.stats["largest"] = max(self.stats["largest"], len(batch))
+        try:
+            outputs = self.batch_fn(inputs)
+            if inspect.isawaitable(outputs):
+                outputs = await outputs
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+        except BaseException as error:
+            # Every caller in the batch sees the failure. A cancelled batch
+            # (e.g. the executor shut down with cancel_futures=True) fails
+            # them with an ordinary error, so their requests get a 500
+            # instead of a CancelledError in a task that wasn't cancelled
+            failure = error
+            if isinstance(error, asyncio.CancelledError):
+                failure = RuntimeError("Inference batch was cancelled")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(failure)
+            if not isinstance(error, Exception):
+                raise
+        finally:
+            # batch_fn returned fewer outputs than inputs: never leave a caller waiting
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(
+                        RuntimeError(f"batch_fn returned fewer outputs than the {len(batch)} inputs")
+                    )
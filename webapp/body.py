@@ -0,0 +1,104 @@
+# webapp/body.py
+# Reading ASGI request bodies in linear time, with a size limit
+
+import os
+
+# Largest request body a route accepts unless it asks for another limit
+MAX_BODY_SIZE = int(os.environ.get("WEBAPP_MAX_BODY_SIZE", 10 * 1024 * 1024))
+
+
+class RequestBodyTooLarge(Exception):
+    """
+    Raised when a request body is bigger than the allowed size.
+    """
+
+    def __init__(self, max_size):
+        super().__init__(f"Request body exceeds {max_size} bytes")
+        self.max_size = max_size
+
+
+class ClientDisconnected(Exception):
+    """
+    Raised when the client disconnects before sending the whole body.
+
+    The body read so far is incomplete, so the route must not act on it;
+    there is nobody left to answer either.
+    """
+
+
+def _check_content_length(scope, max_size):
+    # Reject up front when the client already told us the size
+    for name, value in scope.get("headers", ()) if scope else ():
+        if name == b"content-length":
+            if value.isdigit() and int(value) > max_size:
+                raise RequestBodyTooLarge(max_size)
+            return
+
+
+async def iter_body(receive, max_size=None, scope=None):
+    """
+    Yield the request body chunk by chunk as it arrives.
+
+    Args:
+        receive: The ASGI receive callable.
+        max_size (int or None): Byte limit; defaults to MAX_BODY_SIZE.
+        scope (dict or None): If given, a too-large content-length header is
+            rejected before anything is read.
+
+    Raises:
+        RequestBodyTooLarge: As soon as the limit is passed.
+        ClientDisconnected: If the client goes away mid-body.
+    """
+    max_size = MAX_BODY_SIZE if max_size is None else max_size
+    _check_content_length(scope, max_size)
+
+    received = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnected()
+        if (chunk := message.get("body", b"")):
+            if (received := received + len(chunk)) > max_size:
+                raise RequestBodyTooLarge(max_size)
+            yield chunk
+        if not message.get("more_body", False):
+            return
+
+
+async def read_body(receive, max_size=None, scope=None):
+    """
+    Read the whole request body.
+
+    Chunks are collected in a list and joined once, so the cost is linear
+    in the body size (unlike `body += chunk`).
+
+    Returns:
+        bytes: The request body.
+
+    Raises:
+        RequestBodyTooLarge: If the body is bigger than `max_size`.
+        ClientDisconnected: If the client goes away before the body ends.
+    """
+    chunks = [chunk async for chunk in iter_body(receive, max_size, scope)]
+    if len(chunks) == 1:
+        return chunks[0]
+    return b"".join(chunks)
+
+
+async def send_payload_too_large(send, error):
+    """
+    Send a 413 response for a RequestBodyTooLarge error.
+    """
+    body = str(error).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"text/plain"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
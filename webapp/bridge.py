@@ -0,0 +1,177 @@
+# webapp/bridge.py
+# Run ASGI routes from the synchronous server on one shared event loop
+
+import asyncio
+import queue
+import threading
+from urllib.parse import unquote
+
+# Request bodies up to this size are read by the server thread before the
+# app starts, so small POSTs reach receive() without an extra thread hop.
+FIRST_CHUNK_SIZE = 64 * 1024
+
+# Response messages buffered between the loop and the server thread
+# before send() starts waiting (backpressure for streaming responses).
+SEND_BUFFER = 16
+
+_DONE = object()
+
+
+class AsyncBridge:
+    """
+    A long-lived asyncio event loop running in a background thread.
+
+    Sync code hands coroutines to the loop with submit()/run() instead of
+    calling asyncio.run() (and building a new loop) for every request.
+    """
+
+    def __init__(self, name="asgi-bridge"):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def start(self):
+        if not self.thread.is_alive():
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the bridge loop.
+
+        Returns:
+            concurrent.futures.Future: Resolves with the coroutine's result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """
+        Run a coroutine on the bridge loop and block until it finishes.
+        """
+        return self.submit(coro).result(timeout)
+
+
+_bridge = None
+_bridge_lock = threading.Lock()
+
+
+def get_bridge():
+    """
+    Return the process-wide bridge, starting its loop thread on first use.
+    """
+    global _bridge
+    if _bridge is None:
+        with _bridge_lock:
+            if _bridge is None:
+                _bridge = AsyncBridge().start()
+    return _bridge
+
+
+def build_scope(handler):
+    """
+    Build an ASGI HTTP scope from a BaseHTTPRequestHandler.
+    """
+    path, _, query = handler.path.partition("?")
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.3"},
+        "http_version": handler.request_version.partition("/")[2] or "1.0",
+        "method": handler.command,
+        "scheme": "http",
+        "path": unquote(path),
+        "raw_path": path.encode("latin-1"),
+        "query_string": query.encode("latin-1"),
+        "root_path": "",
+        "headers": [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in handler.headers.items()
+        ],
+        "client": handler.client_address[:2],
+        "server": handler.server.server_address[:2],
+    }
+
+
+def serve_asgi(handler, asgi_app, bridge=None):
+    """
+    Serve one request on `handler` (a BaseHTTPRequestHandler) with an ASGI app.
+
+    The app runs on the shared bridge loop. Its receive() reads the request
+    body from the handler's socket and its send() passes messages back to
+    this thread, which writes them out, so the loop never blocks on I/O.
+    """
+    bridge = bridge or get_bridge()
+    loop = bridge.loop
+    scope = build_scope(handler)
+
+    remaining = int(handler.headers.get("Content-Length") or 0)
+    first_chunk = handler.rfile.read(min(remaining, FIRST_CHUNK_SIZE))
+    remaining -= len(first_chunk)
+    outgoing = queue.Queue(maxsize=SEND_BUFFER)
+    response_done = asyncio.Event()
+    body_state = {"first": first_chunk, "remaining": remaining, "complete": False}
+
+    async def receive():
+        if body_state["complete"]:
+            await response_done.wait()
+            return {"type": "http.disconnect"}
+        if (chunk := body_state["first"]) is not None:
+            body_state["first"] = None
+        else:
+            size = min(body_state["remaining"], FIRST_CHUNK_SIZE)
+            chunk = await loop.run_in_executor(None, handler.rfile.read, size)
+            body_state["remaining"] -= len(chunk)
+            if not chunk:
+                body_state["remaining"] = 0
+        more_body = body_state["remaining"] > 0
+        body_state["complete"] = not more_body
+        return {"type": "http.request", "body": chunk, "more_body": more_body}
+
+    async def send(message):
+        try:
+            outgoing.put_nowait(message)
+        except queue.Full:
+            await loop.run_in_executor(None, outgoing.put, message)
+
+    async def run_app():
+        try:
+            await asgi_app(scope, receive, send)
+        finally:
+            response_done.set()
+            await send(_DONE)
+
+    future = bridge.submit(run_app())
+    started = False
+    connected = True
+    while (message := outgoing.get()) is not _DONE:
+        if not connected:
+            continue
+        try:
+            if message["type"] == "http.response.start":
+                handler.send_response(message["status"])
+                for name, value in message.get("headers", []):
+                    handler.send_header(name.decode("latin-1"), value.decode("latin-1"))
+                handler.end_headers()
+                started = True
+            elif message["type"] == "http.response.body":
+                handler.wfile.write(message.get("body", b""))
+        except OSError:
+            # Client went away: stop the app, keep draining until it exits
+            connected = False
+            future.cancel()
+
+    if not connected:
+        return
+    try:
+        future.result()
+    except Exception:
+        if not started:
+            handler.send_error(500)
+        raise
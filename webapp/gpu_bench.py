@@ -0,0 +1,154 @@
+# webapp/gpu_bench.py
+# Benchmark harness for the chapter 6 kernels: NumPy vs. Numba CPU vs. CUDA
+
+import json
+import math
+import platform
+import statistics
+import time
+
+import numba
+import numpy as np
+from numba import config as numba_config
+from numba import cuda
+
+from webapp.gpu_kernels import KERNELS, THREADS_PER_BLOCK, compile_kernels
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+WARMUP_RUNS = 3
+REPEATS = 30
+# The CUDA simulator runs every thread in Python; larger arrays take minutes
+MAX_SIMULATED_SIZE = 10_000
+
+NUMPY_OPS = {"add": np.add, "multiply": np.multiply}
+
+
+def measure(func, warmup=WARMUP_RUNS, repeats=REPEATS):
+    """
+    Time `func()` after `warmup` untimed calls.
+
+    `func` must not return before its work is finished; for CUDA that
+    means synchronizing the stream inside it.
+
+    Returns:
+        dict: Runs and median/p95/mean/stdev/min/max in microseconds.
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        func()
+        timings.append((time.perf_counter_ns() - start) / 1000)
+    timings.sort()
+    return {
+        "runs": repeats,
+        "median_us": statistics.median(timings),
+        "p95_us": timings[min(repeats - 1, math.ceil(repeats * 0.95) - 1)],
+        "mean_us": statistics.fmean(timings),
+        "stdev_us": statistics.stdev(timings) if repeats > 1 else 0.0,
+        "min_us": timings[0],
+        "max_us": timings[-1],
+    }
+
+
+def _numpy_runner(kernel, a, b):
+    op, result = NUMPY_OPS[kernel], np.empty_like(a)
+    return lambda: op(a, b, out=result)
+
+
+def _cpu_runner(kernel, a, b):
+    cpu_kernel, result = KERNELS[kernel][1], np.empty_like(a)
+    return lambda: cpu_kernel(a, b, result)
+
+
+def _cuda_runners(kernel, a, b):
+    # Inputs are copied to the device once: the kernel timing is compute
+    # only, and the host<->device round trip is timed on its own
+    cuda_kernel = KERNELS[kernel][0]
+    stream = cuda.stream()
+    d_a, d_b = cuda.to_device(a, stream=stream), cuda.to_device(b, stream=stream)
+    d_result = cuda.device_array_like(a, stream=stream)
+    host_result = np.empty_like(a)
+    blocks_per_grid = max((a.size + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK, 1)
+
+    def run_kernel():
+        cuda_kernel[blocks_per_grid, THREADS_PER_BLOCK, stream](d_a, d_b, d_result)
+        stream.synchronize()
+
+    def run_transfer():
+        cuda.to_device(a, stream=stream, to=d_a)
+        cuda.to_device(b, stream=stream, to=d_b)
+        d_result.copy_to_host(host_result, stream=stream)
+        stream.synchronize()
+
+    return {"cuda": run_kernel, "cuda_transfer": run_transfer}
+
+
+def environment():
+    """
+    Versions and hardware the numbers were taken on.
+    """
+    info = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "numba": numba.__version__,
+        "machine": platform.machine(),
+        "numba_threads": numba_config.NUMBA_NUM_THREADS,
+        "cuda_available": cuda.is_available(),
+        "cuda_simulator": bool(numba_config.ENABLE_CUDASIM),
+    }
+    if info["cuda_available"] and not info["cuda_simulator"]:
+        name = cuda.get_current_device().name
+        info["cuda_device"] = name.decode() if isinstance(name, bytes) else name
+    return info
+
+
+def run_sweep(sizes=SIZES, kernels=tuple(KERNELS), warmup=WARMUP_RUNS, repeats=REPEATS,
+              dtype=np.float32):
+    """
+    Benchmark every kernel on every backend over a sweep of array sizes.
+
+    Backends: "numpy" (the ufunc into a preallocated output), "numba_cpu"
+    (the njit(parallel=True) kernel) and, when CUDA or the simulator is
+    available, "cuda" (kernel on device-resident arrays) and
+    "cuda_transfer" (copying the inputs in and the result out). Kernels are
+    compiled before anything is timed and their compile times are
+    reported on their own.
+
+    Returns:
+        dict: {"environment", "compile_ms", "results": [one row per
+        kernel/backend/size]}; see to_json().
+    """
+    use_cuda = cuda.is_available()
+    # record=False: leave the startup numbers in gpu_kernels.stats alone
+    compile_ms = {"numba_cpu": compile_kernels("cpu", record=False)["compile_ms"]}
+    if use_cuda:
+        compile_ms["cuda"] = compile_kernels("cuda", record=False)["compile_ms"]
+
+    results = []
+    for size in sizes:
+        a = np.linspace(-1.0, 1.0, size, dtype=dtype)
+        b = np.linspace(2.0, -2.0, size, dtype=dtype)
+        for kernel in kernels:
+            runners = {
+                "numpy": _numpy_runner(kernel, a, b),
+                "numba_cpu": _cpu_runner(kernel, a, b),
+            }
+            if use_cuda and not (numba_config.ENABLE_CUDASIM and size > MAX_SIMULATED_SIZE):
+                runners.update(_cuda_runners(kernel, a, b))
+            for backend, func in runners.items():
+                row = {"kernel": kernel, "backend": backend, "size": size,
+                       "dtype": np.dtype(dtype).name}
+                row.update(measure(func, warmup, repeats))
+                row["throughput_gelem_s"] = size / row["median_us"] / 1000
+                results.append(row)
+
+    return {"environment": environment(), "compile_ms": compile_ms, "results": results}
+
+
+def to_json(report, indent=2):
+    """
+    Serialize a run_sweep() report, stamped with the time it was taken.
+    """
+    return json.dumps({"timestamp": time.time(), **report}, indent=indent)
@@ -0,0 +1,147 @@
+# webapp/gpu_buffers.py
+# Reusable pinned host and device buffers for the GPU routes
+
+import threading
+from contextlib import ExitStack, contextmanager
+
+import numpy as np
+from numba import cuda
+
+from webapp.gpu_kernels import KERNELS, THREADS_PER_BLOCK, get_backend
+
+HOST = "host"  # pinned (page-locked) host memory on CUDA, plain NumPy on CPU
+DEVICE = "device"
+MIN_SIZE_CLASS = 256
+
+
+def size_class(size):
+    """
+    Smallest power of two >= `size` (at least MIN_SIZE_CLASS elements).
+    """
+    return max(MIN_SIZE_CLASS, 1 << (max(size, 1) - 1).bit_length())
+
+
+class BufferPool:
+    """
+    Free lists of preallocated arrays, keyed by (kind, dtype, size class).
+
+    A borrowed buffer is a view of the first `size` elements of an array
+    from its size class, so requests of nearby sizes share buffers. Each
+    class keeps at most `max_per_class` idle arrays; extras returned beyond
+    that are dropped.
+
+    Safe to use from the sync-route thread pool.
+
+    Args:
+        max_per_class (int): Idle arrays kept per (kind, dtype, size class).
+    """
+
+    def __init__(self, max_per_class=8):
+        self.max_per_class = max_per_class
+        self.free = {}
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "dropped": 0, "bytes_held": 0}
+
+    def _allocate(self, kind, length, dtype):
+        if kind == DEVICE:
+            return cuda.device_array(length, dtype=dtype)
+        if get_backend() == "cuda":
+            return cuda.pinned_array(length, dtype=dtype)
+        return np.empty(length, dtype=dtype)
+
+    def acquire(self, kind, size, dtype=np.float32):
+        """
+        An array of at least `size` elements; give it back with release().
+        """
+        dtype = np.dtype(dtype)
+        key = (kind, dtype.str, size_class(size))
+        with self.lock:
+            if arrays := self.free.get(key):
+                self.stats["hits"] += 1
+                array = arrays.pop()
+                self.stats["bytes_held"] -= array.nbytes
+                return array
+            self.stats["misses"] += 1
+        return self._allocate(kind, key[2], dtype)
+
+    def release(self, kind, array):
+        key = (kind, array.dtype.str, array.size)
+        with self.lock:
+            arrays = self.free.setdefault(key, [])
+            if len(arrays) >= self.max_per_class:
+                self.stats["dropped"] += 1
+                return
+            arrays.append(array)
+            self.stats["bytes_held"] += array.nbytes
+
+    @contextmanager
+    def borrow(self, kind, size, dtype=np.float32):
+        """
+        Context manager: a `size`-element view of a pooled buffer.
+        """
+        array = self.acquire(kind, size, dtype)
+        try:
+            yield array[:size]
+        finally:
+            self.release(kind, array)
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def snapshot(self):
+        """
+        Counters plus the idle arrays held per class, for reporting.
+        """
+        with self.lock:
+            classes = {
+                f"{kind}:{dtype}:{size}": len(arrays)
+                for (kind, dtype, size), arrays in self.free.items()
+                if arrays
+            }
+            return {**self.stats, "hit_rate": self.hit_rate(), "idle": classes}
+
+    def clear(self):
+        with self.lock:
+            self.free.clear()
+            self.stats["bytes_held"] = 0
+
+
+pool = BufferPool()
+
+
+def run_kernel(name, a, b, buffers=pool):
+    """
+    Run kernel `name` over `a` and `b` using pooled buffers.
+
+    On CUDA the inputs are staged through pinned host buffers, copied to
+    pooled device buffers and the kernel runs on a stream of its own, so
+    concurrent requests don't serialize on the default stream. On CPU only
+    the output buffer comes from the pool.
+
+    Returns:
+        np.ndarray: A copy of the result (the pooled buffers go back).
+    """
+    size, dtype = a.size, a.dtype
+    if get_backend() != "cuda":
+        with buffers.borrow(HOST, size, dtype) as result:
+            KERNELS[name][1](a, b, result)
+            return result.copy()
+
+    stream = cuda.stream()
+    blocks_per_grid = max((size + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK, 1)
+    with ExitStack() as borrowed:
+        h_a, h_b, h_result = (
+            borrowed.enter_context(buffers.borrow(HOST, size, dtype)) for _ in range(3)
+        )
+        d_a, d_b, d_result = (
+            borrowed.enter_context(buffers.borrow(DEVICE, size, dtype)) for _ in range(3)
+        )
+        h_a[:] = a
+        h_b[:] = b
+        d_a.copy_to_device(h_a, stream=stream)
+        d_b.copy_to_device(h_b, stream=stream)
+        KERNELS[name][0][blocks_per_grid, THREADS_PER_BLOCK, stream](d_a, d_b, d_result)
+        d_result.copy_to_host(h_result, stream=stream)
+        stream.synchronize()
+        return np.array(h_result)
@@ -0,0 +1,191 @@
+# webapp/gpu_kernels.py
+# Chapter 6 element-wise kernels: CUDA when a GPU is there, parallel CPU code otherwise
+
+import os
+import time
+
+import numpy as np
+from numba import config as numba_config
+from numba import cuda, njit, prange
+
+# WEBAPP_GPU_BACKEND: "auto" (CUDA if available), "cuda" or "cpu".
+# With NUMBA_ENABLE_CUDASIM=1, "auto" picks the CUDA simulator, so the CUDA
+# path can be checked against the CPU one on a machine without a GPU.
+GPU_BACKEND = os.environ.get("WEBAPP_GPU_BACKEND", "auto")
+BACKENDS = ("auto", "cuda", "cpu")
+THREADS_PER_BLOCK = 256
+
+# Every kernel is compiled for these signatures by compile_kernels() at
+# startup, and cache=True keeps the machine code in __pycache__, so later
+# processes load it instead of compiling again. Other dtypes still work,
+# compiled on first use.
+SIGNATURES = (
+    "void(float32[:], float32[:], float32[:])",
+    "void(float64[:], float64[:], float64[:])",
+)
+
+# Filled by compile_kernels(): compile (or cache load) time and the first
+# launch after it, per kernel, kept apart from execution time
+stats = {"backend": None, "compile_ms": {}, "first_call_ms": {}}
+
+
+@cuda.jit(cache=True)
+def add_arrays_kernel(a, b, result):
+    idx = cuda.grid(1)
+    if idx < a.size:
+        result[idx] = a[idx] + b[idx]
+
+
+@cuda.jit(cache=True)
+def multiply_arrays_kernel(a, b, result):
+    idx = cuda.grid(1)
+    if idx < a.size:
+        result[idx] = a[idx] * b[idx]
+
+
+# Same loop bodies as the CUDA kernels, one prange iteration per GPU thread.
+# No fastmath, so float32 results match the GPU bit for bit.
+@njit(parallel=True, cache=True)
+def add_arrays_cpu(a, b, result):
+    for idx in prange(a.size):
+        result[idx] = a[idx] + b[idx]
+
+
+@njit(parallel=True, cache=True)
+def multiply_arrays_cpu(a, b, result):
+    for idx in prange(a.size):
+        result[idx] = a[idx] * b[idx]
+
+
+KERNELS = {
+    "add": (add_arrays_kernel, add_arrays_cpu),
+    "multiply": (multiply_arrays_kernel, multiply_arrays_cpu),
+}
+
+_backend = None
+
+
+def get_backend():
+    """
+    The backend kernels run on: "cuda" or "cpu", decided on first use.
+
+    Raises:
+        ValueError: WEBAPP_GPU_BACKEND is not one of BACKENDS, or is "cuda"
+            on a machine without CUDA.
+    """
+    global _backend
+    if _backend is None:
+        _backend = set_backend(GPU_BACKEND)
+    return _backend
+
+
+def set_backend(backend):
+    """
+    Choose where kernels run ("auto", "cuda" or "cpu").
+
+    Returns:
+        str: "cuda" or "cpu".
+    """
+    global _backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown GPU backend {backend!r}, expected one of {BACKENDS}")
+    available = cuda.is_available()
+    if backend == "cuda" and not available:
+        raise ValueError("WEBAPP_GPU_BACKEND=cuda but no CUDA device is available")
+    _backend = "cuda" if backend == "cuda" or (backend == "auto" and available) else "cpu"
+    return _backend
+
+
+def launch(name, a, b, result=None, backend=None):
+    """
+    Run kernel `name` ("add" or "multiply") over two 1-D arrays of the same size.
+
+    Args:
+        a, b (np.ndarray): Inputs.
+        result (np.ndarray or None): Output array; allocated like `a` if None.
+        backend (str or None): "cuda" or "cpu"; defaults to get_backend().
+
+    Returns:
+        np.ndarray: `result`.
+    """
+    if a.shape != b.shape or a.ndim != 1:
+        raise ValueError(f"Expected two 1-D arrays of the same size, got {a.shape} and {b.shape}")
+    if result is None:
+        result = np.empty_like(a)
+    cuda_kernel, cpu_kernel = KERNELS[name]
+    if (backend or get_backend()) == "cuda":
+        blocks_per_grid = (a.size + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK
+        cuda_kernel[max(blocks_per_grid, 1), THREADS_PER_BLOCK](a, b, result)
+    else:
+        cpu_kernel(a, b, result)
+    return result
+
+
+def compile_kernels(backend=None, record=True):
+    """
+    Compile every kernel for SIGNATURES and launch each once, ahead of traffic.
+
+    The first launch still pays for loading the code onto the device (CUDA)
+    or starting Numba's thread pool (CPU); it is timed separately.
+
+    Args:
+        backend (str or None): "cuda" or "cpu"; defaults to get_backend().
+        record (bool): Keep the timings in `stats` when `backend` is the one
+            the routes use. Callers that only need the kernels compiled (the
+            benchmark harness) pass False, so the startup numbers survive.
+
+    Returns:
+        dict: Timings for `backend`.
+    """
+    backend = backend or get_backend()
+    timings = {"backend": backend, "compile_ms": {}, "first_call_ms": {}}
+    # The CUDA simulator interprets kernels in Python; there is nothing to compile
+    simulated = backend == "cuda" and numba_config.ENABLE_CUDASIM
+    for name, (cuda_kernel, cpu_kernel) in KERNELS.items():
+        kernel = cuda_kernel if backend == "cuda" else cpu_kernel
+        start = time.perf_counter()
+        if not simulated:
+            for signature in SIGNATURES:
+                kernel.compile(signature)
+        timings["compile_ms"][name] = (time.perf_counter() - start) * 1000
+
+        x_array = np.ones(THREADS_PER_BLOCK, dtype=np.float32)
+        start = time.perf_counter()
+        launch(name, x_array, x_array, backend=backend)
+        if backend == "cuda":
+            cuda.synchronize()
+        timings["first_call_ms"][name] = (time.perf_counter() - start) * 1000
+    if record and backend == get_backend():
+        stats.update(timings)
+    return timings
+
+
+def add_arrays(a, b, result=None):
+    """
+    Element-wise a + b on the selected backend.
+    """
+    return launch("add", a, b, result)
+
+
+def multiply_arrays(a, b, result=None):
+    """
+    Element-wise a * b on the selected backend.
+    """
+    return launch("multiply", a, b, result)
+
+
+def check_backends(n=1000, dtype=np.float32):
+    """
+    Run every kernel on both backends and compare the results.
+
+    Needs CUDA or NUMBA_ENABLE_CUDASIM=1 for the CUDA side.
+
+    Returns:
+        dict: {kernel name: True if CUDA and CPU results are identical}
+    """
+    a = np.linspace(-1000.0, 1000.0, n, dtype=dtype)
+    b = np.linspace(3.0, -7.0, n, dtype=dtype)
+    return {
+        name: np.array_equal(launch(name, a, b, backend="cuda"), launch(name, a, b, backend="cpu"))
+        for name in KERNELS
+    }
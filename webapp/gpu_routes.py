@@ -0,0 +1,59 @@
+# webapp/gpu_routes.py
+# Chapter 6: GPU routes (registered lazily in webapp/routes.py)
+
+import json
+
+import numpy as np
+
+from webapp.gpu_bench import run_sweep, to_json
+from webapp.gpu_buffers import pool, run_kernel
+from webapp.gpu_kernels import get_backend
+
+# Kept small so /gpu-vs-cpu-benchmark answers in about a second
+ROUTE_SIZES = (1_000, 100_000, 1_000_000)
+ROUTE_WARMUP_RUNS = 2
+ROUTE_REPEATS = 10
+
+
+# Route inputs never change: build them once, not per request
+ROUTE_INPUT = np.arange(16, dtype=np.float32)
+
+
+def gpu_sum_route():
+    """
+    Add two small arrays with the chapter 6 kernel (CUDA or its CPU fallback).
+    """
+    result = run_kernel("add", ROUTE_INPUT, ROUTE_INPUT)
+    return f"GPU sum result ({get_backend()}): {result.tolist()}"
+
+
+def gpu_multiply_route():
+    """
+    Multiply two small arrays element-wise with the chapter 6 kernel.
+    """
+    result = run_kernel("multiply", ROUTE_INPUT, ROUTE_INPUT)
+    return f"GPU multiply result ({get_backend()}): {result.tolist()}"
+
+
+def gpu_buffers_route():
+    """
+    Buffer pool counters: hits, misses, hit rate, bytes held and idle buffers.
+    """
+    return json.dumps(pool.snapshot())
+
+
+def gpu_vs_cpu_benchmark_route():
+    """
+    Benchmark the add kernel on NumPy, Numba CPU and CUDA over a few sizes.
+
+    A short run of the webapp.gpu_bench harness (warmup, repeated runs,
+    synchronized CUDA stream, compile time kept apart); see
+    benchmarks/bench_gpu_kernels.py for the full sweep.
+
+    Returns:
+        str: The JSON report.
+    """
+    report = run_sweep(
+        sizes=ROUTE_SIZES, kernels=("add",), warmup=ROUTE_WARMUP_RUNS, repeats=ROUTE_REPEATS
+    )
+    return to_json(report, indent=None)
@@ -0,0 +1,147 @@
+# webapp/handlers.py
+# Route handler classification and the thread pool for blocking handlers
+
+import asyncio
+import inspect
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from webapp.lazy import LazyRoute
+
+# Handler kinds, decided once when a route is registered
+CONSTANT = "constant"  # plain string response
+SYNC = "sync"  # def handler() -> str, may block
+ASYNC = "async"  # async def handler() -> str
+ASGI = "asgi"  # async def handler(scope, receive, send)
+LAZY = "lazy"  # LazyRoute, classified again once resolved
+
+
+def classify_handler(handler):
+    """
+    Work out how a route handler has to be called.
+
+    Returns:
+        str: One of CONSTANT, SYNC, ASYNC, ASGI or LAZY.
+    """
+    if isinstance(handler, str):
+        return CONSTANT
+    if isinstance(handler, LazyRoute):
+        return LAZY
+    if not callable(handler):
+        raise TypeError(f"Route handler must be a string or callable, got {handler!r}")
+
+    target = handler if inspect.isroutine(handler) else handler.__call__
+    if not inspect.iscoroutinefunction(target):
+        return SYNC
+    try:
+        params = inspect.signature(handler).parameters.values()
+    except (TypeError, ValueError):
+        return ASGI
+    positional = [
+        p for p in params
+        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) and p.default is p.empty
+    ]
+    return ASGI if len(positional) == 3 else ASYNC
+
+
+class RouteTable(dict):
+    """
+    The route dict, classifying each handler as it is registered.
+
+    It is still a plain {path: handler} mapping, so `routes["/x"] = func`
+    keeps working; `kinds` holds the classification for each path and
+    `limits` the optional per-route concurrency limit for SYNC handlers.
+    `frozen` holds pre-encoded responses for constant routes (filled by
+    webapp.server.freeze_routes()); changing a path drops its entry.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.kinds = {}
+        self.limits = {}
+        self.frozen = {}
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, path, handler):
+        kind = classify_handler(handler)
+        super().__setitem__(path, handler)
+        self.kinds[path] = kind
+        self.frozen.pop(path, None)
+
+    def __delitem__(self, path):
+        super().__delitem__(path)
+        del self.kinds[path]
+        self.frozen.pop(path, None)
+
+    def update(self, *args, **kwargs):
+        for path, handler in dict(*args, **kwargs).items():
+            self[path] = handler
+
+    def setdefault(self, path, handler=None):
+        if path not in self:
+            self[path] = handler
+        return self[path]
+
+    def pop(self, path, *default):
+        self.kinds.pop(path, None)
+        self.frozen.pop(path, None)
+        return super().pop(path, *default)
+
+    def kind(self, path):
+        return self.kinds.get(path)
+
+    def set_limit(self, path, max_concurrent):
+        """
+        Allow at most `max_concurrent` calls of a SYNC route at once.
+        Extra requests wait on the event loop, not in the thread pool.
+        """
+        self.limits[path] = max_concurrent
+        _semaphores.pop(path, None)
+
+
+# --- Thread pool for SYNC handlers ---
+
+_executor = None
+_semaphores = {}
+
+
+def configure_executor(max_workers=None):
+    """
+    Replace the thread pool that runs blocking (SYNC) handlers.
+
+    Args:
+        max_workers (int or None): Pool size; defaults to WEBAPP_SYNC_WORKERS
+            or 32.
+
+    Returns:
+        ThreadPoolExecutor: The new executor.
+    """
+    global _executor
+    if max_workers is None:
+        max_workers = int(os.environ.get("WEBAPP_SYNC_WORKERS", 32))
+    old, _executor = _executor, ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="sync-route"
+    )
+    if old is not None:
+        old.shutdown(wait=False)
+    return _executor
+
+
+def get_executor():
+    return _executor or configure_executor()
+
+
+async def run_sync(handler, path=None, routes=None):
+    """
+    Call a blocking handler in the thread pool so the event loop stays free.
+
+    If `routes` has a limit for `path`, at most that many calls run at once.
+    """
+    loop = asyncio.get_running_loop()
+    if routes is None or (limit := routes.limits.get(path)) is None:
+        return await loop.run_in_executor(get_executor(), handler)
+
+    if (semaphore := _semaphores.get(path)) is None:
+        semaphore = _semaphores[path] = asyncio.Semaphore(limit)
+    async with semaphore:
+        return await loop.run_in_executor(get_executor(), handler)
@@ -0,0 +1,92 @@
+# webapp/http_clients.py
+# One pooled httpx.AsyncClient per upstream, opened at startup and closed at shutdown
+
+import asyncio
+import os
+from urllib.parse import urlsplit
+
+import httpx
+
+# Upstreams whose clients are opened by open_clients() at startup; calls to
+# any other origin get a client on first use
+UPSTREAMS = ["https://jsonplaceholder.typicode.com"]
+
+# Pool settings, overridable with configure_clients()
+config = {
+    "max_connections": int(os.environ.get("WEBAPP_HTTP_MAX_CONNECTIONS", 100)),
+    "max_keepalive_connections": int(os.environ.get("WEBAPP_HTTP_MAX_KEEPALIVE", 20)),
+    "keepalive_expiry": float(os.environ.get("WEBAPP_HTTP_KEEPALIVE_EXPIRY", 30)),
+    "timeout": float(os.environ.get("WEBAPP_HTTP_TIMEOUT", 10)),
+    "http2": os.environ.get("WEBAPP_HTTP2", "") == "1",
+}
+
+# origin -> (event loop, client). A client's connections belong to the loop
+# that opened them, so a different loop (e.g. a second asyncio.run) gets
+# its own client.
+_clients = {}
+
+
+def origin(url):
+    """
+    "scheme://host[:port]" of `url`: the key clients are pooled under.
+    """
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def configure_clients(**settings):
+    """
+    Change the pool settings (keys of `config`) for clients opened from now on.
+    """
+    unknown = set(settings) - set(config)
+    if unknown:
+        raise ValueError(f"Unknown HTTP client settings: {sorted(unknown)}")
+    config.update(settings)
+
+
+def _new_client():
+    limits = httpx.Limits(
+        max_connections=config["max_connections"],
+        max_keepalive_connections=config["max_keepalive_connections"],
+        keepalive_expiry=config["keepalive_expiry"],
+    )
+    return httpx.AsyncClient(
+        limits=limits, timeout=config["timeout"], http2=config["http2"]
+    )
+
+
+def get_client(url):
+    """
+    The shared AsyncClient for the upstream serving `url`.
+
+    Use it directly instead of `async with httpx.AsyncClient()`: its
+    keep-alive connections are reused by every call, so only the first
+    request to an upstream pays for DNS, TCP and TLS setup. Don't close it;
+    close_clients() does that at shutdown.
+    """
+    loop = asyncio.get_running_loop()
+    key = origin(url)
+    if (entry := _clients.get(key)) is not None and entry[0] is loop and not entry[1].is_closed:
+        return entry[1]
+    client = _new_client()
+    _clients[key] = (loop, client)
+    return client
+
+
+async def open_clients(upstreams=None):
+    """
+    Create the clients for `upstreams` (default UPSTREAMS) on the running loop.
+    """
+    for url in UPSTREAMS if upstreams is None else upstreams:
+        get_client(url)
+
+
+async def close_clients():
+    """
+    Close every client opened on the running loop and forget the others.
+    """
+    loop = asyncio.get_running_loop()
+    for key, (client_loop, client) in list(_clients.items()):
+        del _clients[key]
+        if client_loop is loop:
+            await client.aclose()
@@ -0,0 +1,107 @@
+# webapp/http_sessions.py
+# Pooled requests sessions for the synchronous API client path
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Pool and retry settings, overridable with configure_sessions()
+config = {
+    # Connections kept open per host; size it like the sync server's worker pool
+    "pool_maxsize": int(os.environ.get("WEBAPP_HTTP_POOL_SIZE", 32)),
+    # Hosts with a pool of their own
+    "pool_connections": int(os.environ.get("WEBAPP_HTTP_POOL_HOSTS", 10)),
+    "retries": int(os.environ.get("WEBAPP_HTTP_RETRIES", 3)),
+    "backoff_factor": float(os.environ.get("WEBAPP_HTTP_BACKOFF", 0.3)),
+    "timeout": float(os.environ.get("WEBAPP_HTTP_TIMEOUT", 10)),
+}
+
+# Idempotent requests (GET, PUT, ...) are retried on these; POST never is
+RETRY_STATUSES = (429, 502, 503, 504)
+
+_adapter = None
+_local = threading.local()
+_lock = threading.Lock()
+
+
+class PooledSession(requests.Session):
+    """
+    A Session that applies the configured timeout when a call doesn't set one.
+    """
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", config["timeout"])
+        return super().request(method, url, **kwargs)
+
+
+def _new_adapter():
+    retry = Retry(
+        total=config["retries"],
+        backoff_factor=config["backoff_factor"],
+        status_forcelist=RETRY_STATUSES,
+        raise_on_status=False,
+    )
+    return HTTPAdapter(
+        pool_connections=config["pool_connections"],
+        pool_maxsize=config["pool_maxsize"],
+        max_retries=retry,
+    )
+
+
+def get_adapter():
+    """
+    The HTTPAdapter every session shares.
+
+    Its urllib3 connection pools are thread-safe, so keep-alive connections
+    opened by one worker thread are reused by the others.
+    """
+    global _adapter
+    if _adapter is None:
+        with _lock:
+            if _adapter is None:
+                _adapter = _new_adapter()
+    return _adapter
+
+
+def get_session():
+    """
+    This thread's session, mounted on the shared adapter.
+
+    requests.Session itself isn't thread-safe (cookies, settings), so each
+    thread gets its own; the connections underneath are pooled for all of them.
+    """
+    adapter = get_adapter()
+    if (session := getattr(_local, "session", None)) is None or session.adapter is not adapter:
+        session = PooledSession()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.adapter = adapter
+        _local.session = session
+    return session
+
+
+def configure_sessions(**settings):
+    """
+    Change pool/retry settings (keys of `config`) and start a new shared pool.
+
+    Threads pick up the new pool on their next get_session().
+    """
+    unknown = set(settings) - set(config)
+    if unknown:
+        raise ValueError(f"Unknown HTTP session settings: {sorted(unknown)}")
+    config.update(settings)
+    close_sessions()
+
+
+def close_sessions():
+    """
+    Close the pooled connections; a later get_session() starts a fresh pool.
+    """
+    global _adapter
+    with _lock:
+        old, _adapter = _adapter, None
+    if old is not None:
+        old.close()
@@ -0,0 +1,206 @@
+# webapp/inference.py
+# Where torch forward passes run: inline, a dedicated thread pool, or a process pool
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+BACKENDS = ("inline", "thread", "process")
+
+# Settings, overridable with configure_inference()
+config = {
+    "backend": os.environ.get("WEBAPP_INFERENCE_BACKEND", "thread"),
+    "workers": int(os.environ.get("WEBAPP_INFERENCE_WORKERS", 1)),
+    "torch_threads": int(t) if (t := os.environ.get("WEBAPP_TORCH_THREADS")) else None,
+}
+
+_executor = None
+
+
+def _init_worker(torch_threads, version=None):
+    """
+    Runs once in each inference thread/process before any work.
+    """
+    import torch
+
+    if torch_threads:
+        torch.set_num_threads(torch_threads)
+    # Load and warm the model before the worker takes its first request
+    from webapp.torch_model import warmup
+
+    warmup(version)
+
+
+def _warm_up(version=None):
+    from webapp.torch_model import warmup
+
+    return warmup(version)
+
+
+def _predict_batch(x_values, version=None):
+    from webapp.torch_model import predict_batch
+
+    return predict_batch(x_values, version)
+
+
+def _predict_array(x_array, version=None):
+    from webapp.torch_model import predict_array
+
+    return predict_array(x_array, version)
+
+
+def _make_executor(version=None):
+    if config["backend"] == "thread":
+        return ThreadPoolExecutor(
+            max_workers=config["workers"],
+            thread_name_prefix="inference",
+            initializer=_init_worker,
+            initargs=(config["torch_threads"], version),
+        )
+    if config["backend"] == "process":
+        # spawn, not fork: forking a process that already runs torch threads is unsafe
+        return ProcessPoolExecutor(
+            max_workers=config["workers"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(config["torch_threads"], version),
+        )
+    return None
+
+
+def configure_inference(backend=None, workers=None, torch_threads=None):
+    """
+    Choose the inference backend and (re)create its executor.
+
+    Args:
+        backend (str): "inline" runs on the event loop thread (the old
+            behaviour), "thread" uses a dedicated thread pool, "process"
+            uses worker processes that each load SimpleNet once.
+        workers (int): Threads or processes in the pool.
+        torch_threads (int or None): torch intra-op threads per worker.
+
+    Returns:
+        Executor or None: The new executor (None for "inline").
+    """
+    global _executor
+    config.update(
+        {
+            key: value
+            for key, value in (
+                ("backend", backend),
+                ("workers", workers),
+                ("torch_threads", torch_threads),
+            )
+            if value is not None
+        }
+    )
+    if config["backend"] not in BACKENDS:
+        raise ValueError(
+            f"Unknown inference backend {config['backend']!r}, expected one of {BACKENDS}"
+        )
+
+    shutdown_inference()
+    _executor = _make_executor()
+    return _executor
+
+
+def shutdown_inference():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run(func, *args):
+    if config["backend"] == "inline":
+        return func(*args)
+    executor = _executor or configure_inference()
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+
+async def run_inference(x_values, version=None):
+    """
+    Run one batched forward pass on the configured backend.
+
+    With the thread or process backend the event loop only awaits a future;
+    the forward pass itself runs elsewhere.
+
+    Args:
+        x_values (list[float]): Input values.
+        version (str or None): Model version; None means the worker's
+            active version, so callers pass the one they resolved.
+
+    Returns:
+        list[float]: Model outputs.
+    """
+    return await _run(_predict_batch, x_values, version)
+
+
+async def run_inference_array(x_array, version=None):
+    """
+    Like run_inference(), for a 1-D float32 NumPy array.
+
+    Returns:
+        np.ndarray: Model outputs as float32.
+    """
+    return await _run(_predict_array, x_array, version)
+
+
+async def warm_up_inference(version=None):
+    """
+    Load and warm a model version on the configured backend.
+
+    Returns:
+        dict: The version's stats from the worker that ran it (cold-start
+        load/compile/warmup times and steady-state latency per batch size).
+    """
+    return await _run(_warm_up, version)
+
+
+async def deploy_model(version):
+    """
+    Load and warm `version` on the configured backend, then make it the default.
+
+    Requests keep going to the current version until the new one is ready;
+    batches already running finish on the model they started with.
+
+    With the process backend every worker has its own registry, so a new
+    pool is started whose workers all load `version` in their initializer.
+    Once they are warm it replaces the old pool, which finishes the work
+    already queued on it and exits.
+
+    Returns:
+        tuple: (previous active version, stats of the new version)
+
+    Raises:
+        UnknownModelVersion: No weights file for `version`.
+    """
+    global _executor
+    from webapp.torch_model import registry, resolve_version
+
+    version = resolve_version(version)
+    if config["backend"] == "process":
+        executor = _make_executor(version)
+        loop = asyncio.get_running_loop()
+        # One task per worker: workers are spawned on demand, so this starts
+        # (and warms) all of them before the pool takes traffic
+        try:
+            results = await asyncio.gather(
+                *(
+                    loop.run_in_executor(executor, _warm_up, version)
+                    for _ in range(config["workers"])
+                )
+            )
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        stats = results[0]
+        # The new workers read the weights from disk again
+        registry.changed(version)
+        previous_executor, _executor = _executor, executor
+        if previous_executor is not None:
+            previous_executor.shutdown(wait=False)
+    else:
+        stats = await _run(_warm_up, version)
+    return registry.activate(version), stats
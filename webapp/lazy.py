@@ -0,0 +1,31 @@
+# webapp/lazy.py
+# Routes that are imported on first use
+
+import importlib
+
+
+class LazyRoute:
+    """
+    A route handler declared as "module:attribute" instead of imported.
+
+    The module is only imported when the route is first hit (see
+    webapp.routes.get_route) or during webapp.routes.warmup_routes(),
+    so heavy dependencies like torch or httpx stay out of startup.
+    """
+
+    __slots__ = ("target",)
+
+    def __init__(self, target):
+        if ":" not in target:
+            raise ValueError(f"Expected 'module:attribute', got {target!r}")
+        self.target = target
+
+    def resolve(self):
+        """
+        Import the module and return the handler it names.
+        """
+        module_name, _, attribute = self.target.partition(":")
+        return getattr(importlib.import_module(module_name), attribute)
+
+    def __repr__(self):
+        return f"LazyRoute({self.target!r})"
@@ -0,0 +1,79 @@
+# webapp/lifespan.py
+# ASGI lifespan protocol: one-time startup/shutdown hooks and a readiness gate
+
+import inspect
+
+startup_hooks = []
+shutdown_hooks = []
+
+# "idle" until a server starts the lifespan protocol, then "starting",
+# "ready", "stopping" and "stopped". Apps served without lifespan events
+# stay "idle" and are never gated.
+state = {"phase": "idle"}
+
+
+def on_startup(func):
+    """
+    Decorator: run `func` once when the server starts, before traffic is served.
+    Hooks may be plain functions or coroutine functions.
+    """
+    startup_hooks.append(func)
+    return func
+
+
+def on_shutdown(func):
+    """
+    Decorator: run `func` once when the server shuts down.
+    Shutdown hooks run in reverse registration order.
+    """
+    shutdown_hooks.append(func)
+    return func
+
+
+def is_ready():
+    """
+    True unless startup is still running or shutdown has begun.
+    """
+    return state["phase"] in ("idle", "ready")
+
+
+async def _call(hook):
+    if inspect.isawaitable(result := hook()):
+        await result
+
+
+async def startup():
+    state["phase"] = "starting"
+    for hook in startup_hooks:
+        await _call(hook)
+    state["phase"] = "ready"
+
+
+async def shutdown():
+    state["phase"] = "stopping"
+    for hook in reversed(shutdown_hooks):
+        await _call(hook)
+    state["phase"] = "stopped"
+
+
+async def handle_lifespan(scope, receive, send):
+    """
+    ASGI handler for scope["type"] == "lifespan".
+    """
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                await startup()
+            except Exception as error:
+                await send({"type": "lifespan.startup.failed", "message": repr(error)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            try:
+                await shutdown()
+            except Exception as error:
+                await send({"type": "lifespan.shutdown.failed", "message": repr(error)})
+                return
+            await send({"type": "lifespan.shutdown.complete"})
+            return
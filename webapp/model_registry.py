@@ -0,0 +1,168 @@
+# webapp/model_registry.py
+# Versioned model weights on disk, loaded and warmed before they take traffic
+
+import os
+import re
+import threading
+import time
+
+import torch
+
+MODEL_DIR = os.environ.get("WEBAPP_MODEL_DIR", "models")
+BUILTIN_VERSION = "builtin"  # the hard-coded weights, always available
+
+# Version names come from request headers, so keep them to safe file names
+_VERSION_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]{0,63}")
+
+
+class UnknownModelVersion(KeyError):
+    """
+    Raised for a model version that isn't loaded and has no weights file.
+    """
+
+
+class ModelRegistry:
+    """
+    Models by version, each one loaded from `<model_dir>/<version>.pt`.
+
+    A version is built, loaded, compiled and warmed by load() before any
+    request can use it. activate() then swaps the default version with a
+    single assignment. Requests that already hold the old model finish on
+    it, and new requests get the new one. Nothing waits on a lock except
+    concurrent loads.
+
+    Args:
+        build_model: Returns a fresh model with the built-in weights.
+        prepare_model: Called as prepare_model(model) once the weights are
+            in; returns (ready_model, stats) after compiling/warming it.
+            The stats are kept in `stats[version]` with the load time.
+        model_dir (str): Directory holding the `<version>.pt` state_dicts.
+        active (str): Version served when a request doesn't ask for one.
+        device: Where the loaded tensors go.
+    """
+
+    def __init__(self, build_model, prepare_model, model_dir=MODEL_DIR,
+                 active=BUILTIN_VERSION, device=None):
+        self.build_model = build_model
+        self.prepare_model = prepare_model
+        self.model_dir = model_dir
+        self.active = active
+        self.device = device
+        self.models = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+        # Called as listener(version) whenever a version's weights may have changed
+        self.listeners = []
+
+    def path(self, version):
+        if not _VERSION_NAME.fullmatch(version):
+            raise UnknownModelVersion(version)
+        return os.path.join(self.model_dir, f"{version}.pt")
+
+    def exists(self, version):
+        """
+        True if `version` is loaded or can be loaded from disk.
+        """
+        if version in self.models or version == BUILTIN_VERSION:
+            return True
+        try:
+            return os.path.isfile(self.path(version))
+        except UnknownModelVersion:
+            return False
+
+    def available(self):
+        """
+        Versions on disk plus the built-in one, sorted by name.
+        """
+        try:
+            names = os.listdir(self.model_dir)
+        except FileNotFoundError:
+            names = []
+        versions = {name[:-3] for name in names if name.endswith(".pt")}
+        return sorted(
+            {BUILTIN_VERSION, *(v for v in versions if _VERSION_NAME.fullmatch(v))}
+        )
+
+    def load(self, version):
+        """
+        Load, prepare and keep `version`, unless it is already loaded.
+
+        Returns:
+            nn.Module: The ready model.
+
+        Raises:
+            UnknownModelVersion: No weights file for `version`.
+        """
+        if (model := self.models.get(version)) is not None:
+            return model
+        with self.lock:
+            if (model := self.models.get(version)) is not None:
+                return model
+            start = time.perf_counter()
+            model = self.build_model()
+            if version != BUILTIN_VERSION:
+                if not os.path.isfile(path := self.path(version)):
+                    raise UnknownModelVersion(version)
+                state_dict = torch.load(path, map_location=self.device, weights_only=True)
+                model.load_state_dict(state_dict)
+            load_ms = (time.perf_counter() - start) * 1000
+            model, stats = self.prepare_model(model.eval())
+            self.stats[version] = {"version": version, "load_ms": load_ms, **stats}
+            self.models[version] = model
+        self.changed(version)
+        return model
+
+    def get(self, version=None):
+        """
+        The model for `version` (default: the active one), loading it if needed.
+
+        Returns:
+            tuple: (version, model)
+        """
+        version = version or self.active
+        if (model := self.models.get(version)) is None:
+            model = self.load(version)
+        return version, model
+
+    def activate(self, version):
+        """
+        Make `version` the default for new requests.
+
+        Call load() first (see webapp.inference.deploy_model) so the
+        first requests after the swap don't pay for loading it.
+        """
+        if not self.exists(version):
+            raise UnknownModelVersion(version)
+        previous, self.active = self.active, version
+        return previous
+
+    def unload(self, version):
+        """
+        Drop a loaded version; requests still using it keep their reference.
+        """
+        if version == self.active:
+            raise ValueError(f"Can't unload the active model version {version!r}")
+        self.models.pop(version, None)
+        self.stats.pop(version, None)
+        self.changed(version)
+
+    def changed(self, version):
+        """
+        Tell the listeners (e.g. a prediction cache) that `version` was
+        (re)loaded or dropped, so anything computed with it is stale.
+        """
+        for listener in self.listeners:
+            listener(version)
+
+    def save(self, version, model):
+        """
+        Write a model's state_dict as `<model_dir>/<version>.pt`.
+
+        The file is written next to its final name and renamed into place,
+        so a worker loading it never sees a half-written file.
+        """
+        path = self.path(version)
+        os.makedirs(self.model_dir, exist_ok=True)
+        torch.save(model.state_dict(), tmp_path := f"{path}.tmp")
+        os.replace(tmp_path, path)
+        return path
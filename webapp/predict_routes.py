@@ -0,0 +1,270 @@
+# webapp/predict_routes.py
+# Chapter 18: PyTorch inference routes (registered lazily in webapp/routes.py)
+
+import hmac
+import json
+import os
+
+import numpy as np
+
+from webapp.body import (
+    ClientDisconnected,
+    RequestBodyTooLarge,
+    iter_body,
+    read_body,
+    send_payload_too_large,
+)
+from webapp.inference import deploy_model, run_inference_array
+from webapp.model_registry import UnknownModelVersion
+from webapp.streaming import StreamingResponse
+from webapp import torch_model
+from webapp.torch_model import predict_async, registry, resolve_version
+
+# Requests pick a model version with this header; without it they get the active one
+MODEL_VERSION_HEADER = b"x-model-version"
+# POST /models switches the model for all traffic, so it is disabled unless
+# this token is set; callers send it as "authorization: Bearer <token>".
+# Without it, deploy with webapp.inference.deploy_model() from code.
+MODELS_ADMIN_TOKEN = os.environ.get("WEBAPP_MODELS_ADMIN_TOKEN", "")
+
+
+def _request_version(scope):
+    """
+    The model version a request asks for, resolved to a known version.
+
+    Raises:
+        UnknownModelVersion: The header names a version that doesn't exist.
+    """
+    for name, value in scope.get("headers", ()):
+        if name == MODEL_VERSION_HEADER:
+            return resolve_version(value.decode("latin-1").strip())
+    return resolve_version()
+
+
+async def predict_route_async(scope, receive, send):
+    """
+    ASGI-compatible async route handler for PyTorch inference.
+
+    Expects POST request with JSON body: {"x": float}
+    An `x-model-version` header selects the model version.
+
+    Responds with JSON: {"input": x, "output": y, "model_version": version}
+    """
+    assert scope["type"] == "http"
+
+    try:
+        version = _request_version(scope)
+    except UnknownModelVersion as error:
+        await _send_text(send, 404, f"Unknown model version {error.args[0]!r}")
+        return
+
+    # Wait for request body
+    try:
+        body = await read_body(receive, scope=scope)
+    except RequestBodyTooLarge as error:
+        await send_payload_too_large(send, error)
+        return
+    except ClientDisconnected:
+        # Partial body: don't act on it
+        return
+
+    try:
+        data = json.loads(body.decode())
+        x_value = float(data.get("x", 3.0))
+    except Exception:
+        x_value = 3.0
+
+    y_value = await predict_async(x_value, version)
+
+    response_data = {"input": x_value, "output": y_value, "model_version": version}
+    response_body = json.dumps(response_data).encode()
+
+    headers = [(b"content-type", b"application/json")]
+
+    await send({"type": "http.response.start", "status": 200, "headers": headers})
+    await send({"type": "http.response.body", "body": response_body})
+
+
+# Inputs per forward pass in /predict-batch
+PREDICT_BATCH_CHUNK = 65536
+
+
+async def _send_text(send, status, text):
+    body = text.encode()
+    headers = [(b"content-type", b"text/plain"), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _predict_chunks(x_array, version):
+    # Results for one chunk at a time, so a large batch is never held twice
+    for start in range(0, len(x_array), PREDICT_BATCH_CHUNK):
+        yield await run_inference_array(x_array[start : start + PREDICT_BATCH_CHUNK], version)
+
+
+async def _encode_json(x_array, version):
+    yield b"["
+    first = True
+    async for y_chunk in _predict_chunks(x_array, version):
+        # json.dumps on a whole chunk is much faster than item by item
+        if (text := json.dumps(y_chunk.tolist())[1:-1]):
+            yield (text if first else ", " + text).encode()
+            first = False
+    yield b"]"
+
+
+async def _encode_binary(x_array, version):
+    async for y_chunk in _predict_chunks(x_array, version):
+        yield y_chunk.astype("<f4", copy=False).tobytes()
+
+
+async def predict_batch_route(scope, receive, send):
+    """
+    ASGI route handler for batch PyTorch inference.
+
+    Accepts a POST body in one of two formats and answers in the same one:
+    - application/json: a list of floats, e.g. [1.0, 2.5, 3.0]
+    - application/octet-stream: raw little-endian float32 values
+
+    The batch runs through SimpleNet in chunks of PREDICT_BATCH_CHUNK and
+    the results are streamed back as each chunk finishes. Every chunk uses
+    the same model version (the `x-model-version` header or the active one),
+    even if another version is activated mid-stream.
+    """
+    assert scope["type"] == "http"
+
+    try:
+        version = _request_version(scope)
+    except UnknownModelVersion as error:
+        await _send_text(send, 404, f"Unknown model version {error.args[0]!r}")
+        return
+
+    content_type = b""
+    for name, value in scope.get("headers", ()):
+        if name == b"content-type":
+            content_type = value.split(b";")[0].strip().lower()
+    binary = content_type == b"application/octet-stream"
+
+    # Collect into a bytearray: writable, so NumPy/torch can wrap it without a copy
+    buffer = bytearray()
+    try:
+        async for chunk in iter_body(receive, scope=scope):
+            buffer += chunk
+    except RequestBodyTooLarge as error:
+        await send_payload_too_large(send, error)
+        return
+    except ClientDisconnected:
+        # Partial body: don't act on it
+        return
+
+    if binary:
+        if len(buffer) % 4:
+            await _send_text(send, 400, "Body length must be a multiple of 4 bytes (float32)")
+            return
+        # Zero-copy view; astype only copies on big-endian hosts
+        x_array = np.frombuffer(buffer, dtype="<f4").astype(np.float32, copy=False)
+        encoder = _encode_binary(x_array, version)
+    else:
+        try:
+            data = json.loads(buffer)
+            if isinstance(data, dict):
+                data = data.get("x", [])
+            x_array = np.asarray(data, dtype=np.float32).reshape(-1)
+        except (ValueError, TypeError):
+            await _send_text(send, 400, "Expected a JSON list of numbers")
+            return
+        encoder = _encode_json(x_array, version)
+
+    response = StreamingResponse(
+        encoder, content_type=b"application/octet-stream" if binary else b"application/json"
+    )
+    await response(scope, receive, send)
+
+
+async def _send_json(send, status, data):
+    body = json.dumps(data).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _is_admin(scope):
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return scheme.lower() == "bearer" and hmac.compare_digest(
+                token.strip().encode(), MODELS_ADMIN_TOKEN.encode()
+            )
+    return False
+
+
+def _models_status():
+    status = {
+        "active": registry.active,
+        "loaded": sorted(registry.models),
+        "available": registry.available(),
+    }
+    if (cache := torch_model.prediction_cache) is not None:
+        status["prediction_cache"] = {
+            **cache.stats,
+            "size": len(cache),
+            "hit_rate": cache.hit_rate(),
+        }
+    return status
+
+
+async def models_route(scope, receive, send):
+    """
+    ASGI route handler for the model registry.
+
+    GET lists the active, loaded and available model versions, plus the
+    prediction cache counters when the cache is on.
+    POST {"version": "v2"} loads and warms `<WEBAPP_MODEL_DIR>/v2.pt` on the
+    inference backend, then makes it the active version. Requests keep
+    being served by the previous version until the swap. POST answers 405
+    unless WEBAPP_MODELS_ADMIN_TOKEN is set, and 401 without that token.
+    """
+    assert scope["type"] == "http"
+
+    if scope.get("method", "GET") != "POST":
+        await _send_json(send, 200, _models_status())
+        return
+
+    if not MODELS_ADMIN_TOKEN:
+        await _send_text(send, 405, "Model deploys over HTTP are disabled")
+        return
+    if not _is_admin(scope):
+        await _send_text(send, 401, "Missing or wrong admin token")
+        return
+
+    try:
+        body = await read_body(receive, scope=scope)
+    except RequestBodyTooLarge as error:
+        await send_payload_too_large(send, error)
+        return
+    except ClientDisconnected:
+        # Partial body: don't act on it
+        return
+
+    try:
+        version = str(json.loads(body)["version"])
+    except (ValueError, TypeError, KeyError):
+        await _send_text(send, 400, 'Expected JSON {"version": "<name>"}')
+        return
+
+    try:
+        previous, stats = await deploy_model(version)
+    except UnknownModelVersion:
+        await _send_text(send, 404, f"Unknown model version {version!r}")
+        return
+
+    await _send_json(
+        send,
+        200,
+        {
+            **_models_status(),
+            "previous": previous,
+            "load_ms": stats["load_ms"],
+            "warmup_ms": stats["warmup_ms"],
+        },
+    )
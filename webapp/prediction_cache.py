@@ -0,0 +1,91 @@
+# webapp/prediction_cache.py
+# Bounded LRU/TTL cache of model outputs for repeated inputs
+
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Remember model outputs by (model version, quantized input).
+
+    Inputs are rounded to `decimals` places before lookup, so values that
+    differ only by float noise share an entry. The least recently used entry
+    is evicted once `max_size` entries are held, and entries older than `ttl`
+    seconds are treated as misses.
+
+    invalidate() may be called from another thread (the registry calls it
+    from the inference worker that loaded a version). It only bumps the
+    version's generation, which is part of every key, so stale entries stop
+    matching at once and age out of the LRU order.
+
+    Args:
+        max_size (int): Most entries kept.
+        ttl (float): Seconds an entry stays valid; 0 keeps it until evicted.
+        decimals (int): Decimal places the input is rounded to.
+    """
+
+    def __init__(self, max_size=10_000, ttl=0.0, decimals=6):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.decimals = decimals
+        self.entries = OrderedDict()
+        self.generations = {}
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def quantize(self, x_value):
+        """
+        The input as it is looked up and run through the model.
+        """
+        return round(float(x_value), self.decimals)
+
+    def key(self, version, x_value):
+        """
+        The cache key for `x_value` under the current weights of `version`.
+
+        Take the key before running the model and put() the result under
+        it: if the version is reloaded meanwhile, the result lands under the
+        old generation and is never served.
+        """
+        return (version, self.generations.get(version, 0), self.quantize(x_value))
+
+    def get(self, key):
+        """
+        The cached output for `key`, or None.
+        """
+        if (entry := self.entries.get(key)) is None:
+            self.stats["misses"] += 1
+            return None
+        y_value, expires = entry
+        if expires and expires < time.monotonic():
+            self.entries.pop(key, None)
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return y_value
+
+    def put(self, key, y_value):
+        expires = time.monotonic() + self.ttl if self.ttl else 0.0
+        self.entries[key] = (y_value, expires)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, version=None):
+        """
+        Forget every entry for `version`, or all entries when it is None.
+        """
+        if version is None:
+            self.entries.clear()
+        else:
+            self.generations[version] = self.generations.get(version, 0) + 1
+        self.stats["invalidations"] += 1
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,232 @@
+# webapp/router.py
+# Compiled prefix-tree router for path-parameter routes (see Chapter 15)
+
+import re
+
+# Group bodies we know how to match one path segment at a time.
+# Anything else falls back to a plain regex scan.
+SEGMENT_TYPES = {
+    r"\d+": "int",
+    r"[\w-]+": "slug",
+    r"[-\w]+": "slug",
+    r"\w+": "word",
+    r"[^/]+": "str",
+}
+
+_GROUP_RE = re.compile(r"^\(\?P<(?P<name>[A-Za-z_]\w*)>(?P<body>[^()]*)\)$")
+_REGEX_META = set(".^$*+?{}[]\\|()")
+
+
+def _split_segments(body):
+    """
+    Split a pattern body on the "/" that separate path segments.
+
+    A "/" inside a group or character class, such as the one in [^/]+,
+    belongs to that segment.
+    """
+    parts, start, depth, index = [], 0, 0, 0
+    in_class = False
+    while index < len(body):
+        char = body[index]
+        if char == "\\":
+            index += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+            # A "]" right after "[" or "[^" is a literal, not the end
+            if body[index + 1:index + 2] == "^":
+                index += 1
+            if body[index + 1:index + 2] == "]":
+                index += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "/" and depth == 0:
+            parts.append(body[start:index])
+            start = index + 1
+        index += 1
+    parts.append(body[start:])
+    return parts
+
+
+def _matches_int(segment):
+    return segment.isdecimal()
+
+
+_SLUG_RE = re.compile(r"[\w-]+")
+_WORD_RE = re.compile(r"\w+")
+
+
+def _matches_slug(segment):
+    return _SLUG_RE.fullmatch(segment) is not None
+
+
+def _matches_word(segment):
+    return _WORD_RE.fullmatch(segment) is not None
+
+
+def _matches_str(segment):
+    return segment != ""
+
+
+MATCHERS = {
+    "int": _matches_int,
+    "slug": _matches_slug,
+    "word": _matches_word,
+    "str": _matches_str,
+}
+
+
+class _Node:
+    __slots__ = ("static", "params", "handler", "pattern")
+
+    def __init__(self):
+        self.static = {}
+        self.params = []  # [(type_name, matcher, param_name, child), ...]
+        self.handler = None
+        self.pattern = None
+
+
+def compile_pattern(pattern):
+    """
+    Split a route regex into typed segments.
+
+    Args:
+        pattern (str): Route regex such as r"^/users/(?P<user_id>\\d+)$".
+
+    Returns:
+        list or None: [("static", text) or (type_name, param_name), ...],
+        or None when the pattern can't be matched segment by segment.
+    """
+    if not (pattern.startswith("^/") and pattern.endswith("$")):
+        return None
+    if pattern.endswith("\\$"):
+        return None
+
+    segments = []
+    for part in _split_segments(pattern[2:-1]):
+        if (group := _GROUP_RE.match(part)) is not None:
+            if (type_name := SEGMENT_TYPES.get(group["body"])) is None:
+                return None
+            segments.append((type_name, group["name"]))
+        elif _REGEX_META.isdisjoint(part):
+            segments.append(("static", part))
+        else:
+            return None
+    return segments
+
+
+class RadixRouter:
+    """
+    Route table compiled into a prefix tree of path segments.
+
+    Static segments are looked up first, then typed parameters in the
+    order they were registered. Patterns the tree can't express are kept
+    in a fallback list and tried with re.match afterwards.
+
+    Precedence therefore differs from chapter 15's handle_request, where
+    the first registered pattern wins: here a static segment beats a
+    parameter registered before it, and any route in the tree beats a
+    fallback pattern, whatever the registration order. Route tables whose
+    patterns don't overlap (the usual case) dispatch the same either way.
+    """
+
+    def __init__(self):
+        self.root = _Node()
+        self.fallback = []
+
+    @classmethod
+    def from_routes(cls, routes):
+        """
+        Build a router from a {pattern: handler} dict like Chapter 15's routes.
+        """
+        router = cls()
+        for pattern, handler in routes.items():
+            router.add_route(pattern, handler)
+        return router
+
+    def add_route(self, pattern, handler):
+        if (segments := compile_pattern(pattern)) is None:
+            self.fallback.append((re.compile(pattern), pattern, handler))
+            return
+
+        node = self.root
+        for kind, value in segments:
+            if kind == "static":
+                node = node.static.setdefault(value, _Node())
+                continue
+            for type_name, _, name, child in node.params:
+                if type_name == kind and name == value:
+                    node = child
+                    break
+            else:
+                child = _Node()
+                node.params.append((kind, MATCHERS[kind], value, child))
+                node = child
+
+        if node.handler is None:
+            node.handler = handler
+            node.pattern = pattern
+
+    def route(self, pattern):
+        """
+        Decorator that registers a handler, like Chapter 15's @route.
+        """
+
+        def decorator(func):
+            self.add_route(pattern, func)
+            return func
+
+        return decorator
+
+    def match(self, path):
+        """
+        Find the handler for a path.
+
+        Returns:
+            tuple or None: (handler, params) where params holds the named
+            groups as strings, or None if nothing matches.
+        """
+        if path.startswith("/"):
+            params = {}
+            if (node := self._walk(self.root, path[1:].split("/"), 0, params)) is not None:
+                return node.handler, params
+
+        for regex, _, handler in self.fallback:
+            if (match := regex.match(path)):
+                return handler, match.groupdict()
+        return None
+
+    def _walk(self, node, parts, index, params):
+        if index == len(parts):
+            return node if node.handler is not None else None
+
+        part = parts[index]
+        if (child := node.static.get(part)) is not None:
+            if (found := self._walk(child, parts, index + 1, params)) is not None:
+                return found
+
+        for _, matcher, name, child in node.params:
+            if matcher(part):
+                params[name] = part
+                if (found := self._walk(child, parts, index + 1, params)) is not None:
+                    return found
+                del params[name]
+        return None
+
+    def handle(self, path, query=None):
+        """
+        Dispatch a path the way chapter 15's handle_request does.
+
+        Returns:
+            The handler's return value, or "404 Not Found".
+        """
+        if (found := self.match(path)) is None:
+            return "404 Not Found"
+        handler, params = found
+        if query:
+            return handler(**params, **query)
+        return handler(**params)
@@ -1,9 +1,13 @@
 # webapp/routes.py
 
-import json
+import time
+
+from webapp.handlers import RouteTable
+from webapp.lazy import LazyRoute
 
 # Base routes from Chapter 1
-routes = {"/": "home page", "/about": "about page"}
+# RouteTable is a dict that also records how each handler must be called
+routes = RouteTable({"/": "home page", "/about": "about page"})
 
 
 # Chapter 2: Control Flow - add a /age route
@@ -51,6 +55,12 @@ def gpu_demo():
 
 routes["/gpu-demo"] = gpu_demo
 
+# Kernels run on CUDA when available, else as parallel CPU loops (webapp/gpu_kernels.py)
+routes["/gpu-sum"] = LazyRoute("webapp.gpu_routes:gpu_sum_route")
+routes["/gpu-multiply"] = LazyRoute("webapp.gpu_routes:gpu_multiply_route")
+routes["/gpu-vs-cpu-benchmark"] = LazyRoute("webapp.gpu_routes:gpu_vs_cpu_benchmark_route")
+routes["/gpu-buffers"] = LazyRoute("webapp.gpu_routes:gpu_buffers_route")
+
 
 # Chapter 7: Modules and File I/O - add a /file-content route
 def file_content():
@@ -101,45 +111,11 @@ routes["/user"] = user_info
 #     return ", ".join([u.username for u in users])
 
 # --- Chapter 18: PyTorch Integration ---
-from webapp.torch_model import predict_async
-
-
-async def predict_route_async(scope, receive, send):
-    """
-    ASGI-compatible async route handler for PyTorch inference.
-
-    Expects POST request with JSON body: {"x": float}
-
-    Responds with JSON: {"input": x, "output": y}
-    """
-    assert scope["type"] == "http"
-
-    # Wait for request body
-    body = b""
-    while True:
-        message = await receive()
-        body += message.get("body", b"")
-        if not message.get("more_body", False):
-            break
-
-    try:
-        data = json.loads(body.decode())
-        x_value = float(data.get("x", 3.0))
-    except Exception:
-        x_value = 3.0
-
-    y_value = await predict_async(x_value)
-
-    response_data = {"input": x_value, "output": y_value}
-    response_body = json.dumps(response_data).encode()
-
-    headers = [(b"content-type", b"application/json")]
-
-    await send({"type": "http.response.start", "status": 200, "headers": headers})
-    await send({"type": "http.response.body", "body": response_body})
-
-
-routes["/predict"] = predict_route_async
+# Heavy routes are declared by "module:attribute" and imported on first hit,
+# so serving /about never loads torch, httpx or requests.
+routes["/predict"] = LazyRoute("webapp.predict_routes:predict_route_async")
+routes["/predict-batch"] = LazyRoute("webapp.predict_routes:predict_batch_route")
+routes["/models"] = LazyRoute("webapp.predict_routes:models_route")
 
 
 def get_route(url):
@@ -150,9 +126,27 @@ def get_route(url):
         str or callable: response string or async ASGI app.
     """
     handler = routes.get(url)
+    if isinstance(handler, LazyRoute):
+        handler = routes[url] = handler.resolve()
     return handler if handler is not None else "404 Not Found"
 
 
+def warmup_routes():
+    """
+    Import every lazy route now instead of on its first request.
+
+    Returns:
+        dict: Seconds spent resolving each route, keyed by path.
+    """
+    timings = {}
+    for url, handler in list(routes.items()):
+        if isinstance(handler, LazyRoute):
+            start = time.perf_counter()
+            routes[url] = handler.resolve()
+            timings[url] = time.perf_counter() - start
+    return timings
+
+
 # --- Chapter 2 User Exercises ---
 def exercise2_1():
     return "Positive"
@@ -167,79 +161,11 @@ def exercise2_3():
 
 
 # --- Chapter 20: External API Integration ---
-from chapter20_external_api import external_users_route_async
-
-routes["/external-users"] = external_users_route_async
+routes["/external-users"] = LazyRoute("chapter20_external_api:external_users_route_async")
 
 # --- Chapter 21: API Client Integration ---
-import json as _json
-
-from chapter21_api_client import (
-    fetch_users_sync,
-    create_post_sync,
-    fetch_users_async,
-    create_post_async,
-)
-
-
-def external_users_sync():
-    """
-    Synchronous route that fetches users from an external API.
-    """
-    users = fetch_users_sync()
-    return _json.dumps(users)
-
-
-routes["/external-users-sync"] = external_users_sync
-
-
-async def external_users_async_route(scope, receive, send):
-    """
-    ASGI async route that fetches users from an external API asynchronously.
-    """
-    users = await fetch_users_async()
-    body = _json.dumps(users).encode()
-
-    headers = [(b"content-type", b"application/json")]
-
-    await send({"type": "http.response.start", "status": 200, "headers": headers})
-    await send({"type": "http.response.body", "body": body})
-
-
-routes["/external-users-async"] = external_users_async_route
-
-
-async def create_post_async_route(scope, receive, send):
-    """
-    ASGI async route that accepts POST JSON input and creates a post via external API.
-    """
-    assert scope["type"] == "http"
-
-    # Read request body
-    body_bytes = b""
-    while True:
-        message = await receive()
-        body_bytes += message.get("body", b"")
-        if not message.get("more_body", False):
-            break
-
-    try:
-        data = _json.loads(body_bytes.decode())
-        title = data.get("title", "Untitled")
-        body = data.get("body", "")
-        user_id = int(data.get("userId", 1))
-    except Exception:
-        title = "Untitled"
-        body = ""
-        user_id = 1
-
-    post = await create_post_async(title, body, user_id)
-    response_body = _json.dumps(post).encode()
-
-    headers = [(b"content-type", b"application/json")]
-
-    await send({"type": "http.response.start", "status": 201, "headers": headers})
-    await send({"type": "http.response.body", "body": response_body})
-
-
-routes["/create-post-async"] = create_post_async_route
+routes["/external-users-sync"] = LazyRoute("webapp.api_routes:external_users_sync")
+routes["/external-users-async"] = LazyRoute("webapp.api_routes:external_users_async_route")
+routes["/create-post-async"] = LazyRoute("webapp.api_routes:create_post_async_route")
+routes["/create-posts-bulk"] = LazyRoute("webapp.api_routes:create_posts_bulk_route")
+routes["/upstream-stats"] = LazyRoute("webapp.api_routes:upstream_stats")
@@ -1,59 +1,318 @@
 # webapp/server.py
 
 import asyncio
+import os
+import queue
+import signal
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from threading import Thread
 
-from webapp.routes import routes, get_route
-from webapp.models import init_db
-from tortoise import run_async
+from webapp import lifespan
+from webapp.asgi_server import Lifespan, serve
+from webapp.bridge import get_bridge, serve_asgi
+from webapp.handlers import ASGI, ASYNC, SYNC, run_sync
+from webapp.routes import routes, get_route, warmup_routes
 
 
-def start_sync_server(host="0.0.0.0", port=8000):
+def _text_response(status, text):
     """
-    Start a simple synchronous HTTP server using built-in modules.
+    Build the ASGI start/body messages for a plain-text response.
+    """
+    body = text.encode()
+    headers = [
+        (b"content-type", b"text/plain"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    return (
+        {"type": "http.response.start", "status": status, "headers": headers},
+        {"type": "http.response.body", "body": body},
+    )
+
+
+# Pre-built (start, body) messages for every constant route, filled by
+# freeze_routes(). The route table drops a path's entry whenever that path
+# is reassigned or removed. The 404 response is built once as well.
+frozen_routes = routes.frozen
+NOT_FOUND = _text_response(404, "404 Not Found")
+NOT_READY = _text_response(503, "Service warming up")
+NOT_READY[0]["headers"].append((b"retry-after", b"1"))
+
+
+def freeze_routes():
+    """
+    Pre-encode every constant route (a plain string in `routes`).
+
+    Called once at import. Reassigning or removing a route drops its
+    entry, so a changed route is never served stale; call this again to
+    put constant routes added at runtime on the fast path.
+
+    Returns:
+        int: Number of frozen routes.
+    """
+    frozen_routes.clear()
+    for path, handler in routes.items():
+        if isinstance(handler, str):
+            frozen_routes[path] = (
+                NOT_FOUND if handler == "404 Not Found" else _text_response(200, handler)
+            )
+    return len(frozen_routes)
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler for the built-in synchronous server.
     """
 
-    class RequestHandler(BaseHTTPRequestHandler):
-        def do_GET(self):
-            response = get_route(self.path)
-            if callable(response):
-                # If the route is an async ASGI handler, show a message
-                self.send_response(501)
-                self.send_header("Content-type", "text/plain")
-                self.end_headers()
-                self.wfile.write(b"This route requires async/ASGI support.")
-            else:
-                self.send_response(200 if response != "404 Not Found" else 404)
-                self.send_header("Content-type", "text/plain")
-                self.end_headers()
-                self.wfile.write(response.encode())
-
-    server = HTTPServer((host, port), RequestHandler)
-    print(f"Starting sync server on http://{host}:{port}")
+    def do_GET(self):
+        path = self.path.partition("?")[0]
+        if (frozen := frozen_routes.get(path)) is not None:
+            start, body = frozen
+            self.send_response(start["status"])
+            self.send_header("Content-type", "text/plain")
+            self.end_headers()
+            self.wfile.write(body["body"])
+            return
+        if path not in routes:
+            self.send_response(404)
+            self.send_header("Content-type", "text/plain")
+            self.end_headers()
+            self.wfile.write(NOT_FOUND[1]["body"])
+            return
+
+        response = get_route(path)
+        if (kind := routes.kind(path)) == ASGI:
+            # Async ASGI handlers run on the shared bridge event loop
+            serve_asgi(self, response)
+        else:
+            if kind == SYNC:
+                # Plain function routes (e.g. /file-content) return a string
+                response = str(response())
+            elif kind == ASYNC:
+                response = str(get_bridge().run(response()))
+            self.send_response(200 if response != "404 Not Found" else 404)
+            self.send_header("Content-type", "text/plain")
+            self.end_headers()
+            self.wfile.write(response.encode())
+
+    # POST routes (/predict, /create-post-async, ...) dispatch the same way
+    do_POST = do_GET
+
+
+SERVICE_UNAVAILABLE = (
+    b"HTTP/1.0 503 Service Unavailable\r\n"
+    b"Content-Type: text/plain\r\n"
+    b"Content-Length: 19\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n"
+    b"\r\n"
+    b"Service Unavailable"
+)
+
+
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer that hands accepted connections to a fixed pool of worker threads.
+
+    Accepted connections wait in a queue of at most `queue_size` entries.
+    When the queue is full the connection is answered with a 503 straight
+    away instead of waiting behind slow handlers.
+    """
+
+    # listen() backlog: keep it roomy so overflow reaches process_request
+    # and gets an explicit 503 rather than a dropped SYN
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, workers=8, queue_size=64):
+        self.pending = queue.Queue(maxsize=queue_size)
+        self.rejected = 0
+        super().__init__(server_address, handler_class)
+
+        self.workers = [
+            Thread(target=self._worker, name=f"http-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def process_request(self, request, client_address):
+        try:
+            self.pending.put_nowait((request, client_address))
+        except queue.Full:
+            self.rejected += 1
+            try:
+                request.sendall(SERVICE_UNAVAILABLE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+
+    def _worker(self):
+        while (item := self.pending.get()) is not None:
+            request, client_address = item
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        for _ in self.workers:
+            self.pending.put(None)
+
+
+def make_sync_server(
+    host="0.0.0.0", port=8000, workers=None, queue_size=64, handler_class=RequestHandler
+):
+    """
+    Build (but don't start) the synchronous HTTP server.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind.
+        workers (int or None): Worker threads; None keeps the original
+            single-threaded HTTPServer.
+        queue_size (int): Connections allowed to wait for a worker before
+            new ones are shed with a 503.
+        handler_class: BaseHTTPRequestHandler subclass to serve requests with.
+
+    Returns:
+        HTTPServer: The server, ready for serve_forever().
+    """
+    if workers is None:
+        return HTTPServer((host, port), handler_class)
+    return PooledHTTPServer((host, port), handler_class, workers, queue_size)
+
+
+def start_sync_server(host="0.0.0.0", port=8000, workers=None, queue_size=64):
+    """
+    Start a simple synchronous HTTP server using built-in modules.
+
+    Pass `workers` to serve requests from a bounded thread pool instead of
+    one at a time (see make_sync_server).
+    """
+    server = make_sync_server(host, port, workers, queue_size)
+    mode = f"{workers} workers, queue {queue_size}" if workers else "single-threaded"
+    print(f"Starting sync server on http://{host}:{port} ({mode})")
     server.serve_forever()
 
 
-async def start_async_server():
+async def start_async_server(host="0.0.0.0", port=8000):
     """
-    Placeholder for an async server using ASGI (e.g., uvicorn).
+    Serve `app` with the built-in asyncio HTTP/1.1 server (webapp/asgi_server.py).
+
+    No external ASGI server needed; `uvicorn webapp.server:app` still works too.
     """
-    print("Async server placeholder. Run with: uvicorn webapp.server:app --reload")
+    server = await serve(app, host, port)
+    app_lifespan = Lifespan(app)
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+
+    print(f"Starting async server on http://{host}:{port}")
+    async with server:
+        # Listening already; requests get a 503 until warmup finishes
+        await app_lifespan.startup()
+        try:
+            await stop.wait()
+        finally:
+            await app_lifespan.shutdown()
 
 
-def start_server():
+def start_server(workers=None, queue_size=64):
     """
-    Start the web server (sync version in a thread) and initialize the async DB.
+    Start the sync web server after running the startup hooks.
+
+    Startup (database, model warmup) runs on the bridge loop, the same loop
+    that serves async routes, so Tortoise connections belong to it.
     """
+    bridge = get_bridge()
+    bridge.run(lifespan.startup())
+    try:
+        start_sync_server(workers=workers, queue_size=queue_size)
+    finally:
+        bridge.run(lifespan.shutdown())
+
+
+# --- Lifespan hooks: run once per process, on the serving loop ---
+
+
+@lifespan.on_startup
+async def init_database():
+    # Imported here so importing webapp.server doesn't load Tortoise ORM
+    from webapp.models import init_db
+
+    await init_db()
+
+
+@lifespan.on_shutdown
+async def close_database():
+    from tortoise import Tortoise
+
+    await Tortoise.close_connections()
+
+
+@lifespan.on_startup
+async def open_http_clients():
+    # One pooled httpx.AsyncClient per upstream, on the serving loop
+    from webapp.http_clients import open_clients
+
+    await open_clients()
+
+
+@lifespan.on_shutdown
+async def close_http_clients():
+    from webapp.http_clients import close_clients
+
+    await close_clients()
+
 
-    # Initialize async DB in background
-    def init_db_task():
-        asyncio.run(init_db())
+@lifespan.on_shutdown
+def close_http_sessions():
+    from webapp.http_sessions import close_sessions
 
-    Thread(target=init_db_task, daemon=True).start()
+    close_sessions()
 
-    # Start sync HTTP server
-    start_sync_server()
+
+@lifespan.on_shutdown
+def stop_inference_workers():
+    from webapp.inference import shutdown_inference
+
+    shutdown_inference()
+
+
+@lifespan.on_startup
+async def warm_up_routes():
+    # Import lazy routes (torch, httpx, ...) in a thread, then load and warm
+    # the model so the first /predict doesn't pay for lazy init
+    await asyncio.get_running_loop().run_in_executor(None, warmup_routes)
+
+    from webapp.inference import warm_up_inference
+
+    stats = await warm_up_inference()
+    steady = ", ".join(f"{size}: {ms:.3f}" for size, ms in stats["steady_ms"].items())
+    print(
+        f"Model {stats['version']} ready ({stats['compile_mode']}): "
+        f"load {stats['load_ms']:.1f} ms, compile {stats['compile_ms']:.1f} ms, "
+        f"warmup {stats['warmup_ms']:.1f} ms, steady-state ms per batch size {{{steady}}}"
+    )
+
+
+@lifespan.on_startup
+async def compile_gpu_kernels():
+    # Compile the chapter 6 kernels (or load them from Numba's disk cache)
+    # so the first /gpu-* request doesn't pay seconds of JIT time
+    from webapp.gpu_kernels import compile_kernels
+
+    stats = await asyncio.get_running_loop().run_in_executor(None, compile_kernels)
+    compiled = ", ".join(
+        f"{name}: {ms:.1f} + {stats['first_call_ms'][name]:.1f}"
+        for name, ms in stats["compile_ms"].items()
+    )
+    print(f"GPU kernels ready ({stats['backend']}): compile + first launch ms {{{compiled}}}")
 
 
 # Optional: ASGI app for uvicorn/hypercorn
@@ -61,21 +320,52 @@ async def app(scope, receive, send):
     """
     Minimal ASGI app compatible with uvicorn/hypercorn.
     """
+    if scope["type"] == "lifespan":
+        await lifespan.handle_lifespan(scope, receive, send)
+        return
     assert scope["type"] == "http"
     path = scope["path"]
 
+    # Readiness gate: no traffic until startup hooks have finished
+    if not lifespan.is_ready():
+        await send(NOT_READY[0])
+        await send(NOT_READY[1])
+        return
+
+    # Fast path: constant routes send their pre-built messages as-is
+    if (frozen := frozen_routes.get(path)) is not None:
+        await send(frozen[0])
+        await send(frozen[1])
+        return
+
+    # Unknown paths: no lookup, no string comparison
+    if path not in routes:
+        await send(NOT_FOUND[0])
+        await send(NOT_FOUND[1])
+        return
+
     handler = get_route(path)
-    if callable(handler):
+    if (kind := routes.kind(path)) == ASGI:
         # If the handler is an async ASGI app, call it
         await handler(scope, receive, send)
+        return
+
+    if kind == SYNC:
+        # Blocking handlers run in the thread pool, never on the event loop
+        handler = str(await run_sync(handler, path, routes))
+    elif kind == ASYNC:
+        handler = str(await handler())
+
+    if handler == "404 Not Found":
+        await send(NOT_FOUND[0])
+        await send(NOT_FOUND[1])
     else:
-        response_text = handler
-        status_code = 200 if response_text != "404 Not Found" else 404
-        headers = [(b"content-type", b"text/plain")]
-        await send(
-            {"type": "http.response.start", "status": status_code, "headers": headers}
-        )
-        await send({"type": "http.response.body", "body": response_text.encode()})
+        start, body = _text_response(200, handler)
+        await send(start)
+        await send(body)
+
+
+freeze_routes()
 
 
 if __name__ == "__main__":
@@ -90,4 +380,10 @@ if __name__ == "__main__":
     """
     print(walrus_art)
     print("Welcome to the Walrus Operator Web Framework!")
-    start_server()
+    if os.environ.get("WEBAPP_SERVER") == "async":
+        asyncio.run(start_async_server())
+    else:
+        start_server(
+            workers=int(w) if (w := os.environ.get("WEBAPP_WORKERS")) else None,
+            queue_size=int(os.environ.get("WEBAPP_QUEUE_SIZE", 64)),
+        )
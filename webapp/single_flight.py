@@ -0,0 +1,98 @@
+# webapp/single_flight.py
+# Request coalescing: concurrent identical calls share one in-flight call
+
+import asyncio
+import threading
+
+
+def request_key(method, url, params=None):
+    """
+    Key identifying an upstream request: method, URL and sorted query params.
+    """
+    items = tuple(sorted((params or {}).items()))
+    return (method.upper(), url, items)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one, for async code.
+
+    The first caller starts `func(*args)` as a task; callers arriving while
+    it runs await the same task. Every caller gets its result, or its
+    exception re-raised. The call runs as its own task, so a caller that is
+    cancelled (e.g. its client disconnected) doesn't cancel it for the rest.
+    Once the call finishes the key is free again, so results are never
+    reused after the fact; caching is a separate layer.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.stats = {"calls": 0, "deduplicated": 0, "errors": 0}
+
+    async def do(self, key, func, *args):
+        loop = asyncio.get_running_loop()
+        if (task := self.calls.get(key)) is None or task.get_loop() is not loop:
+            task = self.calls[key] = loop.create_task(func(*args))
+            task.add_done_callback(lambda done, key=key: self._finished(key, done))
+            self.stats["calls"] += 1
+        else:
+            self.stats["deduplicated"] += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key, task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        # Retrieve the exception even if every caller was cancelled
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["errors"] += 1
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SyncSingleFlight:
+    """
+    SingleFlight for blocking code called from several threads.
+
+    The first thread runs `func(*args)`; threads arriving with the same key
+    while it runs wait for it and get its result or its exception.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.stats = {"calls": 0, "deduplicated": 0, "errors": 0}
+
+    def do(self, key, func, *args):
+        with self.lock:
+            if (call := self.calls.get(key)) is None:
+                call = self.calls[key] = _Call()
+                self.stats["calls"] += 1
+                leader = True
+            else:
+                self.stats["deduplicated"] += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args)
+            return call.result
+        except BaseException as error:
+            call.error = error
+            self.stats["errors"] += 1
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
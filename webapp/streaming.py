@@ -0,0 +1,133 @@
+# webapp/streaming.py
+# Streaming ASGI responses and an incremental JSON array encoder
+
+import asyncio
+import json
+
+# Small pieces are gathered until at least this many bytes before sending,
+# so a list of tiny items doesn't turn into one ASGI message per item.
+FLUSH_SIZE = 16 * 1024
+
+
+async def _aiter(content):
+    # Accept both sync and async iterables
+    if hasattr(content, "__aiter__"):
+        async for item in content:
+            yield item
+    else:
+        for item in content:
+            yield item
+
+
+async def _wait_for_disconnect(receive):
+    """
+    Return once the client disconnects.
+
+    Body messages the app didn't read are drained. After the body is
+    complete an ASGI server's receive() blocks until the disconnect; one
+    that keeps answering instead (or fails) can't report it, so this then
+    waits until it is cancelled.
+    """
+    body_complete = False
+    try:
+        while (message := await receive())["type"] != "http.disconnect":
+            if body_complete:
+                break
+            body_complete = not message.get("more_body", False)
+        else:
+            return
+    except Exception:
+        pass
+    await asyncio.get_running_loop().create_future()
+
+
+async def iter_json_array(items, separator=b", "):
+    """
+    Encode items as a JSON array, one item at a time.
+
+    The output is the same as json.dumps(list(items)).encode(), but the
+    list is never built: each item is encoded as soon as it is produced.
+
+    Args:
+        items: Sync or async iterable of JSON-serializable values.
+
+    Yields:
+        bytes: Pieces of the JSON document.
+    """
+    yield b"["
+    first = True
+    async for item in _aiter(items):
+        if first:
+            first = False
+            yield json.dumps(item).encode()
+        else:
+            yield separator + json.dumps(item).encode()
+    yield b"]"
+
+
+class StreamingResponse:
+    """
+    ASGI response whose body comes from a (sync or async) iterable of bytes.
+
+    Pieces are sent as http.response.body messages with more_body=True, so
+    the client starts receiving data right away and memory stays flat.
+    When the client disconnects mid-stream (http.disconnect), iteration
+    stops and an async generator passed as `content` is closed.
+
+    Example:
+        response = StreamingResponse(iter_json_array(users))
+        await response(scope, receive, send)
+    """
+
+    def __init__(
+        self,
+        content,
+        status=200,
+        content_type=b"application/json",
+        headers=None,
+        flush_size=FLUSH_SIZE,
+    ):
+        self.content = content
+        self.status = status
+        self.headers = [(b"content-type", content_type), *(headers or [])]
+        self.flush_size = flush_size
+
+    async def __call__(self, scope, receive, send):
+        # Watch receive() while streaming: if the client goes away, stop
+        # iterating and close the content, so whatever feeds it (upstream
+        # requests, model chunks) stops too instead of running for nobody
+        body = asyncio.ensure_future(self._send_body(send))
+        disconnect = asyncio.ensure_future(_wait_for_disconnect(receive))
+        try:
+            await asyncio.wait((body, disconnect), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            disconnect.cancel()
+            if not body.done():
+                body.cancel()
+                await asyncio.wait((body,))
+            if hasattr(self.content, "aclose"):
+                await self.content.aclose()
+        if not body.cancelled():
+            body.result()
+
+    async def _send_body(self, send):
+        await send({"type": "http.response.start", "status": self.status, "headers": self.headers})
+
+        pending = []
+        pending_size = 0
+        pieces = _aiter(self.content)
+        try:
+            async for piece in pieces:
+                if isinstance(piece, str):
+                    piece = piece.encode()
+                pending.append(piece)
+                if (pending_size := pending_size + len(piece)) >= self.flush_size:
+                    await send(
+                        {"type": "http.response.body", "body": b"".join(pending), "more_body": True}
+                    )
+                    pending.clear()
+                    pending_size = 0
+        finally:
+            await pieces.aclose()
+
+        await send({"type": "http.response.body", "body": b"".join(pending), "more_body": False})
@@ -1,7 +1,19 @@
 
+import os
+import statistics
+import time
+from functools import partial
+from typing import List, Optional
+
+import numpy as np
 import torch
 import torch.nn as nn
 
+from webapp.batching import InferenceBatcher
+from webapp.inference import run_inference
+from webapp.model_registry import BUILTIN_VERSION, ModelRegistry, UnknownModelVersion
+from webapp.prediction_cache import PredictionCache
+
 # Check if CUDA is available and select device
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 print(f"Using device: {device}")
@@ -17,23 +29,223 @@ class SimpleNet(nn.Module):
     def forward(self, x):
         return self.fc(x)
 
-# Initialize the model and set dummy weights
-model = SimpleNet().to(device)
-with torch.no_grad():
-    model.fc.weight.fill_(2.0)
-    model.fc.bias.fill_(1.0)
+# Models live in a versioned registry (webapp/model_registry.py). The
+# "builtin" version has the hard-coded weights; others are state_dicts in
+# WEBAPP_MODEL_DIR. Each version is built on first use or up front by
+# warmup() at lifespan startup, so importing this module stays cheap.
+# WEBAPP_TORCH_COMPILE: "" (eager), "script" (TorchScript) or "compile" (torch.compile)
+COMPILE_MODE = os.environ.get("WEBAPP_TORCH_COMPILE", "")
+# Batch sizes run once per loaded version: single requests, micro-batches, /predict-batch chunks
+WARMUP_BATCH_SIZES = (1, 8, 64, 1024, 65536)
+STEADY_STATE_RUNS = 20
+
+def _build_model():
+    net = SimpleNet().to(device)
+    with torch.no_grad():
+        net.fc.weight.fill_(2.0)
+        net.fc.bias.fill_(1.0)
+    return net.eval()
+
+def _compile(net, mode):
+    if mode == "script":
+        return torch.jit.script(net)
+    if mode == "compile":
+        net = torch.compile(net, dynamic=True)
+        # torch.compile is lazy: compile now, not on the first request
+        with torch.inference_mode():
+            net(torch.zeros(2, 1, device=device))
+        return net
+    if mode:
+        raise ValueError(f"Unknown WEBAPP_TORCH_COMPILE mode {mode!r}")
+    return net
+
+def _forward_array(net, x_array):
+    with torch.inference_mode():
+        x_tensor = torch.from_numpy(x_array).to(device).unsqueeze(1)
+        y_tensor = net(x_tensor)
+        return y_tensor.squeeze(1).cpu().numpy()
+
+def prepare_model(net, compile_mode=None, batch_sizes=WARMUP_BATCH_SIZES, runs=STEADY_STATE_RUNS):
+    """
+    Compile a freshly loaded model and run forward passes at representative batch sizes.
+
+    The registry calls this for every version before it takes traffic. The
+    first pass at each size pays for allocator growth, kernel selection and
+    (for torch.compile) guards; it is recorded in "first_call_ms". The
+    median of the next `runs` passes goes in "steady_ms".
+
+    Args:
+        net (nn.Module): The model, weights loaded, in eval mode.
+        compile_mode (str or None): "", "script" or "compile"; defaults to
+            WEBAPP_TORCH_COMPILE. A mode that fails falls back to eager.
+
+    Returns:
+        tuple: (ready model, stats dict)
+    """
+    mode = COMPILE_MODE if compile_mode is None else compile_mode
+    start = time.perf_counter()
+    try:
+        ready = _compile(net, mode)
+    except Exception as error:
+        print(f"Model compile ({mode}) failed, using eager mode: {error}")
+        ready, mode = net, ""
+    stats = {
+        "compile_mode": mode or "eager",
+        "compile_ms": (time.perf_counter() - start) * 1000,
+        "first_call_ms": {},
+        "steady_ms": {},
+    }
+
+    start = time.perf_counter()
+    for batch_size in batch_sizes:
+        x_array = np.linspace(-1.0, 1.0, batch_size, dtype=np.float32)
+        timings = []
+        for _ in range(runs + 1):
+            call_start = time.perf_counter()
+            _forward_array(ready, x_array)
+            timings.append((time.perf_counter() - call_start) * 1000)
+        stats["first_call_ms"][batch_size] = timings[0]
+        stats["steady_ms"][batch_size] = statistics.median(timings[1:])
+    stats["warmup_ms"] = (time.perf_counter() - start) * 1000
+    return ready, stats
+
+registry = ModelRegistry(
+    _build_model,
+    prepare_model,
+    active=os.environ.get("WEBAPP_MODEL_VERSION", BUILTIN_VERSION),
+    device=device,
+)
+
+def get_model(version=None):
+    """
+    The loaded model for `version` (default: the active one), loading it on first use.
+    """
+    return registry.get(version)[1]
+
+def warmup(version=None):
+    """
+    Make sure `version` (default: the active one) is loaded and warmed.
+
+    Returns:
+        dict: Its cold-start numbers (load, compile and warmup ms) and the
+        first-call and steady-state latency per batch size.
+    """
+    version, _ = registry.get(version)
+    return registry.stats[version]
+
+def resolve_version(version=None):
+    """
+    The version a request should use: `version` if given, else the active one.
+
+    Raises:
+        UnknownModelVersion: `version` is neither loaded nor on disk.
+    """
+    if not version:
+        return registry.active
+    if not registry.exists(version):
+        raise UnknownModelVersion(version)
+    return version
+
+def predict_batch(x_values: List[float], version: Optional[str] = None) -> List[float]:
+    """
+    Run one forward pass over a batch of float inputs.
+
+    The model is looked up once, so a batch that is running when a new
+    version is activated finishes on the model it started with.
+
+    Args:
+        x_values (list[float]): Input values.
+        version (str or None): Model version; defaults to the active one.
+
+    Returns:
+        list[float]: Model outputs, in the same order.
+    """
+    net = get_model(version)
+    with torch.inference_mode():
+        x_tensor = torch.tensor(x_values, dtype=torch.float32, device=device).unsqueeze(1)
+        y_tensor = net(x_tensor)
+        return y_tensor.squeeze(1).tolist()
+
+def predict_array(x_array: np.ndarray, version: Optional[str] = None) -> np.ndarray:
+    """
+    Run one forward pass over a 1-D float32 NumPy array.
+
+    The array is wrapped with torch.from_numpy (no copy) on CPU.
+
+    Args:
+        x_array (np.ndarray): Input values, dtype float32.
+        version (str or None): Model version; defaults to the active one.
+
+    Returns:
+        np.ndarray: Model outputs as float32, same length.
+    """
+    return _forward_array(get_model(version), x_array)
 
-async def predict_async(x_value: float) -> float:
+# Concurrent predict_async() calls for the same model version share one
+# forward pass (up to WEBAPP_BATCH_SIZE inputs). By default only calls made
+# in the same loop iteration are batched; WEBAPP_BATCH_WAIT_MS widens the
+# window. WEBAPP_BATCH_SIZE=1 turns batching off.
+# Batches run through webapp.inference (WEBAPP_INFERENCE_BACKEND), so the
+# forward pass happens off the event loop.
+BATCH_SIZE = int(os.environ.get("WEBAPP_BATCH_SIZE", 64))
+BATCH_WAIT = float(os.environ.get("WEBAPP_BATCH_WAIT_MS", 0)) / 1000
+
+# One batcher per model version, so a batch never mixes versions
+batchers = {}
+
+def get_batcher(version=None):
+    """
+    The InferenceBatcher for `version` (default: the active one).
+    """
+    version = version or registry.active
+    if (batcher := batchers.get(version)) is None:
+        batcher = batchers[version] = InferenceBatcher(
+            partial(run_inference, version=version),
+            max_batch_size=BATCH_SIZE,
+            max_wait=BATCH_WAIT,
+        )
+    return batcher
+
+# Optional cache of outputs for repeated inputs, keyed by model version and
+# the input rounded to WEBAPP_PREDICT_CACHE_DECIMALS places (default 6).
+# WEBAPP_PREDICT_CACHE_SIZE entries (0, the default, turns it off), each
+# valid for WEBAPP_PREDICT_CACHE_TTL seconds (0: until evicted). Entries for
+# a version are dropped whenever the registry (re)loads or unloads it.
+prediction_cache = None
+if cache_size := int(os.environ.get("WEBAPP_PREDICT_CACHE_SIZE", 0)):
+    prediction_cache = PredictionCache(
+        max_size=cache_size,
+        ttl=float(os.environ.get("WEBAPP_PREDICT_CACHE_TTL", 0)),
+        decimals=int(os.environ.get("WEBAPP_PREDICT_CACHE_DECIMALS", 6)),
+    )
+    registry.listeners.append(prediction_cache.invalidate)
+
+async def _predict_uncached(x_value, version):
+    if (batcher := get_batcher(version)).max_batch_size <= 1:
+        return (await run_inference([x_value], version))[0]
+    return await batcher.submit(x_value)
+
+async def predict_async(x_value: float, version: Optional[str] = None) -> float:
     """
     Run inference asynchronously on a single float input.
 
+    With the prediction cache on, the input is rounded first and a repeated
+    input is answered from the cache without a forward pass.
+
     Args:
         x_value (float): Input value.
+        version (str or None): Model version; defaults to the one active
+            when the call is made.
 
     Returns:
         float: Model output.
     """
-    # PyTorch is synchronous, but we can wrap in an async function
-    x_tensor = torch.tensor([[x_value]], dtype=torch.float32, device=device)
-    y_tensor = model(x_tensor)
-    return y_tensor.item()
+    version = version or registry.active
+    if prediction_cache is None:
+        return await _predict_uncached(float(x_value), version)
+
+    key = prediction_cache.key(version, x_value)
+    if (y_value := prediction_cache.get(key)) is None:
+        y_value = await _predict_uncached(key[-1], version)
+        prediction_cache.put(key, y_value)
+    return y_value
@@ -0,0 +1,299 @@
+# webapp/upstream_cache.py
+# TTL cache for upstream JSON fetches: stale-while-revalidate, Cache-Control and ETag
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from webapp.single_flight import SingleFlight, SyncSingleFlight, request_key
+
+# Seconds a response is fresh, unless the upstream's Cache-Control says otherwise
+DEFAULT_TTL = float(os.environ.get("WEBAPP_UPSTREAM_TTL", 60))
+# Seconds past freshness during which the stale copy is served while a
+# background refresh runs
+DEFAULT_STALE = float(os.environ.get("WEBAPP_UPSTREAM_STALE", 300))
+MAX_ENTRIES = int(os.environ.get("WEBAPP_UPSTREAM_CACHE_ENTRIES", 256))
+MAX_BYTES = int(float(os.environ.get("WEBAPP_UPSTREAM_CACHE_MB", 16)) * 1024 * 1024)
+
+
+def parse_cache_control(value):
+    """
+    Cache-Control directives as {name: value or True}, names lowercased.
+    """
+    directives = {}
+    for part in (value or "").split(","):
+        if not (part := part.strip()):
+            continue
+        name, _, argument = part.partition("=")
+        directives[name.strip().lower()] = argument.strip().strip('"') or True
+    return directives
+
+
+class Entry:
+    """
+    One cached response: the raw JSON body plus what is needed to revalidate it.
+    """
+
+    __slots__ = ("content", "etag", "fresh_until", "stale_until")
+
+    def __init__(self, content, etag, fresh_until, stale_until):
+        self.content = content
+        self.etag = etag
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class UpstreamCache:
+    """
+    Cache of upstream GET responses (JSON bodies), keyed by URL.
+
+    - Fresh entries (within the TTL) are returned without touching the network.
+    - Stale entries (within the stale window after that) are returned at
+      once while one background refresh per URL brings them up to date.
+    - Older entries, and misses, are fetched before returning.
+
+    Refreshes send If-None-Match when the upstream gave an ETag; a 304 just
+    extends the entry. The TTL comes from the upstream's Cache-Control
+    (max-age / s-maxage, stale-while-revalidate, must-revalidate,
+    no-cache, no-store) when
+    present, else from set_ttl() per URL prefix, else `default_ttl`.
+
+    Memory is bounded by `max_entries` and `max_bytes` (response body
+    sizes); the least recently used entries go first.
+
+    Bodies are kept as bytes and parsed for each caller, so every call gets
+    its own objects and modifying a result never changes the cache.
+
+    Concurrent misses for the same URL share one upstream request
+    (webapp/single_flight.py), so a burst of clients after an expiry sends
+    one GET, not one each.
+
+    Safe to use from the event loop and from sync-route worker threads.
+    """
+
+    def __init__(self, default_ttl=DEFAULT_TTL, default_stale=DEFAULT_STALE,
+                 max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.default_ttl = default_ttl
+        self.default_stale = default_stale
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = {}
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.refreshing = set()
+        self.lock = threading.Lock()
+        self.tasks = set()
+        self.executor = None
+        self.flights = SingleFlight()
+        self.sync_flights = SyncSingleFlight()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "revalidated": 0,
+                      "refresh_errors": 0, "evictions": 0}
+
+    def set_ttl(self, url_prefix, ttl, stale=None):
+        """
+        Cache URLs starting with `url_prefix` for `ttl` seconds (plus `stale`).
+        """
+        self.ttls[url_prefix] = (ttl, self.default_stale if stale is None else stale)
+
+    def _ttl(self, url):
+        best = ""
+        for prefix in self.ttls:
+            if url.startswith(prefix) and len(prefix) > len(best):
+                best = prefix
+        return self.ttls[best] if best else (self.default_ttl, self.default_stale)
+
+    # --- Lookup ---
+
+    def _lookup(self, url):
+        """
+        ("fresh" | "stale" | "miss", entry or None), counting the outcome.
+        """
+        now = time.monotonic()
+        with self.lock:
+            if (entry := self.entries.get(url)) is not None:
+                self.entries.move_to_end(url)
+                if now < entry.fresh_until:
+                    self.stats["hits"] += 1
+                    return "fresh", entry
+                if now < entry.stale_until:
+                    self.stats["stale_hits"] += 1
+                    return "stale", entry
+            self.stats["misses"] += 1
+            return "miss", entry
+
+    def _claim_refresh(self, url):
+        with self.lock:
+            if url in self.refreshing:
+                return False
+            self.refreshing.add(url)
+            return True
+
+    def _conditional_headers(self, entry):
+        return {"If-None-Match": entry.etag} if entry is not None and entry.etag else {}
+
+    # --- Storing responses ---
+
+    def _store(self, url, entry, status, headers, content):
+        """
+        Update the cache from an upstream response and return the body to serve.
+        """
+        directives = parse_cache_control(headers.get("cache-control"))
+        if status == 304 and entry is not None:
+            content, etag = entry.content, entry.etag
+            self.stats["revalidated"] += 1
+        else:
+            # Fail here on a body that isn't JSON, before it is cached
+            json.loads(content)
+            etag = headers.get("etag")
+        if "no-store" in directives or "private" in directives:
+            self._remove(url)
+            return content
+
+        ttl, stale = self._ttl(url)
+        for name in ("s-maxage", "max-age"):
+            if name in directives:
+                try:
+                    ttl = float(directives[name])
+                    break
+                except ValueError:
+                    pass
+        if "no-cache" in directives:
+            # May be stored, but must be revalidated before every use
+            ttl, stale = 0.0, 0.0
+        elif "stale-while-revalidate" in directives:
+            try:
+                stale = float(directives["stale-while-revalidate"])
+            except ValueError:
+                pass
+        if "must-revalidate" in directives or "proxy-revalidate" in directives:
+            # Never served stale: revalidated once it expires
+            stale = 0.0
+
+        now = time.monotonic()
+        new_entry = Entry(content, etag, now + ttl, now + ttl + stale)
+        with self.lock:
+            if (old := self.entries.pop(url, None)) is not None:
+                self.bytes -= len(old.content)
+            if len(content) <= self.max_bytes:
+                self.entries[url] = new_entry
+                self.bytes += len(content)
+            while self.entries and (
+                len(self.entries) > self.max_entries or self.bytes > self.max_bytes
+            ):
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= len(evicted.content)
+                self.stats["evictions"] += 1
+        return content
+
+    def _remove(self, url):
+        with self.lock:
+            if (old := self.entries.pop(url, None)) is not None:
+                self.bytes -= len(old.content)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    # --- Async path (httpx) ---
+
+    async def _fetch_async(self, url, entry):
+        from webapp.http_clients import get_client
+
+        response = await get_client(url).get(url, headers=self._conditional_headers(entry))
+        if response.status_code != 304:
+            response.raise_for_status()
+        return self._store(url, entry, response.status_code, response.headers, response.content)
+
+    async def _refresh_async(self, url, entry):
+        try:
+            await self._fetch_async(url, entry)
+        except Exception:
+            # Keep serving the stale copy; the next stale hit tries again
+            self.stats["refresh_errors"] += 1
+        finally:
+            self.refreshing.discard(url)
+
+    async def get_json_async(self, url):
+        """
+        GET `url` through the cache from async code.
+
+        Returns:
+            The parsed JSON body, a new object on every call.
+        """
+        state, entry = self._lookup(url)
+        if state == "fresh":
+            return json.loads(entry.content)
+        if state == "stale":
+            if self._claim_refresh(url):
+                task = asyncio.get_running_loop().create_task(self._refresh_async(url, entry))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+            return json.loads(entry.content)
+        content = await self.flights.do(request_key("GET", url), self._fetch_async, url, entry)
+        return json.loads(content)
+
+    # --- Sync path (requests) ---
+
+    def _fetch_sync(self, url, entry):
+        from webapp.http_sessions import get_session
+
+        response = get_session().get(url, headers=self._conditional_headers(entry))
+        if response.status_code != 304:
+            response.raise_for_status()
+        return self._store(url, entry, response.status_code, response.headers, response.content)
+
+    def _refresh_sync(self, url, entry):
+        try:
+            self._fetch_sync(url, entry)
+        except Exception:
+            self.stats["refresh_errors"] += 1
+        finally:
+            self.refreshing.discard(url)
+
+    def get_json_sync(self, url):
+        """
+        GET `url` through the cache from blocking code; stale entries are
+        refreshed on a small background thread pool.
+
+        Returns:
+            The parsed JSON body, a new object on every call.
+        """
+        state, entry = self._lookup(url)
+        if state == "fresh":
+            return json.loads(entry.content)
+        if state == "stale":
+            if self._claim_refresh(url):
+                with self.lock:
+                    if self.executor is None:
+                        self.executor = ThreadPoolExecutor(
+                            max_workers=4, thread_name_prefix="upstream-refresh"
+                        )
+                self.executor.submit(self._refresh_sync, url, entry)
+            return json.loads(entry.content)
+        content = self.sync_flights.do(request_key("GET", url), self._fetch_sync, url, entry)
+        return json.loads(content)
+
+    def snapshot(self):
+        """
+        Counters plus entry count and bytes held, for reporting.
+
+        "single_flight" counts upstream fetches made on a miss ("calls")
+        and callers that shared one already in flight ("deduplicated").
+        """
+        with self.lock:
+            snapshot = {**self.stats, "entries": len(self.entries), "bytes": self.bytes}
+        snapshot["single_flight"] = {
+            name: self.flights.stats[name] + self.sync_flights.stats[name]
+            for name in self.flights.stats
+        }
+        return snapshot
+
+
+cache = UpstreamCache()
+# The jsonplaceholder user list changes rarely
+cache.set_ttl("https://jsonplaceholder.typicode.com/users", 300)